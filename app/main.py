@@ -1,17 +1,28 @@
+import asyncio
+import os
 import sys
+import threading
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 
 # Add src to path for imports
 sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
 
+from typing import List
+
 from fastapi import FastAPI, HTTPException
 import numpy as np
 import logging
+from cachetools import TTLCache
 from prometheus_fastapi_instrumentator import Instrumentator
 
-from app.schemas import PredictRequest, PredictResponse, HealthResponse
-from nyc_delay_risk.serving.model_loader import load_model, get_model
-from nyc_delay_risk.serving.features_online import compute_features_online
+from app.schemas import PredictRequest, PredictResponse, PredictBatchResponse, HealthResponse
+from nyc_delay_risk.config import get_api_workers, get_db_pool_max_size
+from nyc_delay_risk.db import init_pool, close_pool
+from nyc_delay_risk.serving.model_loader import load_model, get_model, make_predict_fn
+from nyc_delay_risk.serving.features_online import (
+    FEATURE_NAMES, compute_features_online, compute_features_online_batch
+)
 
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
@@ -21,34 +32,59 @@ app = FastAPI(title="NYC Subway Delay Risk API")
 # Instrument app for Prometheus metrics
 Instrumentator().instrument(app).expose(app)
 
-# Feature order matching training (alphabetical order after excluding identifiers)
-FEATURE_ORDER = [
-    'alerts_count',
-    'alerts_sum_15m',
-    'alerts_sum_60m',
-    'day_of_week',
-    'hour_of_day',
-    'major_alerts_count',
-    'trip_updates_count',
-    'trip_updates_sum_15m',
-    'trip_updates_sum_60m',
-    'vehicle_positions_count',
-    'vehicle_positions_sum_15m',
-    'vehicle_positions_sum_60m',
-]
+# Predictions per (line_id, stop_id). Facts advance in 60-second buckets, so a
+# prediction stays current for about one bucket; the lock guards the cache
+# across concurrent requests.
+prediction_cache = TTLCache(
+    maxsize=4096,
+    ttl=int(os.getenv("PREDICTION_CACHE_TTL_SECONDS", "60"))
+)
+prediction_cache_lock = threading.Lock()
 
 
 @app.on_event("startup")
 async def startup_event():
-    """Load model at startup."""
-    model_path = Path("/app/models/best_model.pkl")
-    if not model_path.exists():
+    """Open the database and predict pools and load model at startup."""
+    # Each uvicorn worker opens its own pool, so they split the connection budget
+    workers = get_api_workers()
+    
+    # Blocking feature queries and model calls run here, off the event loop.
+    # Every predict thread holds a database connection, so there are no more
+    # threads than pooled connections; extra requests queue on the executor
+    # instead of timing out waiting for a connection
+    app.state.model_pool = ThreadPoolExecutor(
+        max_workers=get_db_pool_max_size(workers), thread_name_prefix="predict"
+    )
+    
+    try:
+        init_pool(workers=workers)
+    except ValueError as e:
+        logger.warning(f"Database pool not initialized ({e}), predictions will fail")
+    
+    # MODEL_PATH can point at a native export (.lgb/.npz) from scripts/export_model.py
+    model_path = Path(os.getenv("MODEL_PATH", "/app/models/best_model.pkl"))
+    if not model_path.exists() and "MODEL_PATH" not in os.environ:
         model_path = Path(__file__).parent.parent / "models" / "best_model.pkl"
     
+    # Specialize the predict path to the model type once instead of on every request
+    app.state.predict_fn = None
     if not model_path.exists():
         logger.warning(f"Model not found at {model_path}, predictions will fail")
     else:
         load_model(model_path)
+        app.state.predict_fn = make_predict_fn(get_model())
+        
+        # Warm up the model so the first real requests don't pay lazy init costs
+        warmup_row = np.zeros((1, len(FEATURE_NAMES)), dtype=np.float32)
+        for _ in range(3):
+            app.state.predict_fn(warmup_row)
+
+
+@app.on_event("shutdown")
+async def shutdown_event():
+    """Close the predict and database pools."""
+    app.state.model_pool.shutdown(wait=True)
+    close_pool()
 
 
 @app.get("/health", response_model=HealthResponse)
@@ -57,40 +93,57 @@ async def health():
     return HealthResponse(status="ok")
 
 
-@app.post("/predict", response_model=PredictResponse)
-async def predict(request: PredictRequest):
-    """Predict delay risk for a station."""
+def get_cached_prediction(request: PredictRequest):
+    """Return the cached prediction for a station, or None."""
+    with prediction_cache_lock:
+        return prediction_cache.get((request.line_id, request.stop_id))
+
+
+def cache_prediction(request: PredictRequest, response: PredictResponse) -> None:
+    """Store a prediction for a station."""
+    with prediction_cache_lock:
+        prediction_cache[(request.line_id, request.stop_id)] = response
+
+
+def features_to_dict(features):
+    """Name a float32 feature array for the response, in FEATURE_NAMES order."""
+    return dict(zip(FEATURE_NAMES, features.tolist()))
+
+
+def predict_risk(feature_array):
+    """Run the loaded model on a (N, len(FEATURE_NAMES)) float32 array.
+    
+    Returns:
+        tuple: (risk_probabilities, risk_labels) as arrays of length N
+    """
+    predict_fn = app.state.predict_fn
+    if predict_fn is None:
+        raise RuntimeError("Model not loaded. Call load_model() first.")
+    
+    return predict_fn(feature_array)
+
+
+def _do_predict(request: PredictRequest) -> PredictResponse:
+    """Compute features and score one station. Blocking; runs on the predict pool."""
     try:
         # Compute features
-        features_dict, latest_bucket_start = compute_features_online(
+        features, latest_bucket_start = compute_features_online(
             request.line_id, request.stop_id
         )
         
-        # Convert features to array in correct order
-        feature_array = np.array([[features_dict[key] for key in FEATURE_ORDER]], dtype=np.float32)
-        
-        # Get model and make prediction
-        model = get_model()
+        # Make prediction on the (1, n_features) view of the feature array
+        risk_probabilities, risk_labels = predict_risk(features.reshape(1, -1))
         
-        # Handle both sklearn and LightGBM models
-        if hasattr(model, 'predict_proba'):
-            # Sklearn model
-            risk_probability = float(model.predict_proba(feature_array)[0, 1])
-            risk_label = int(model.predict(feature_array)[0])
-        else:
-            # LightGBM model
-            proba = model.predict(feature_array, num_iteration=model.best_iteration if hasattr(model, 'best_iteration') else None)
-            risk_probability = float(proba[0])
-            risk_label = int(1 if risk_probability > 0.5 else 0)
-        
-        return PredictResponse(
+        response = PredictResponse(
             line_id=request.line_id,
             stop_id=request.stop_id,
             as_of=latest_bucket_start,
-            risk_label=risk_label,
-            risk_probability=risk_probability,
-            features={k: float(v) for k, v in features_dict.items()}
+            risk_label=int(risk_labels[0]),
+            risk_probability=float(risk_probabilities[0]),
+            features=features_to_dict(features)
         )
+        cache_prediction(request, response)
+        return response
     
     except ValueError as e:
         raise HTTPException(status_code=404, detail=str(e))
@@ -98,3 +151,94 @@ async def predict(request: PredictRequest):
         logger.error(f"Prediction error: {e}", exc_info=True)
         raise HTTPException(status_code=500, detail=f"Prediction failed: {str(e)}")
 
+
+def _do_predict_batch(batch: List[PredictRequest]) -> PredictBatchResponse:
+    """Compute features and score several stations. Blocking; runs on the predict pool."""
+    try:
+        # One result slot per request so predictions come back in request order
+        results = [get_cached_prediction(request) for request in batch]
+        misses = [i for i, cached in enumerate(results) if cached is None]
+        
+        # Compute features for all cache misses in one query
+        station_features = compute_features_online_batch(
+            [(batch[i].line_id, batch[i].stop_id) for i in misses]
+        )
+        
+        found = []
+        not_found = []
+        for i in misses:
+            request = batch[i]
+            station = station_features.get((request.line_id, request.stop_id))
+            if station is None:
+                not_found.append(request)
+                continue
+            features, latest_bucket_start = station
+            found.append((i, features, latest_bucket_start))
+        
+        if found:
+            # Stack all stations into one (N, n_features) float32 array; this
+            # is the dtype both model types consume without another copy
+            feature_array = np.stack([features for _, features, _ in found])
+            
+            risk_probabilities, risk_labels = predict_risk(feature_array)
+            
+            for (i, features, latest_bucket_start), risk_probability, risk_label in zip(
+                found, risk_probabilities, risk_labels
+            ):
+                request = batch[i]
+                response = PredictResponse(
+                    line_id=request.line_id,
+                    stop_id=request.stop_id,
+                    as_of=latest_bucket_start,
+                    risk_label=int(risk_label),
+                    risk_probability=float(risk_probability),
+                    features=features_to_dict(features)
+                )
+                cache_prediction(request, response)
+                results[i] = response
+        
+        predictions = [response for response in results if response is not None]
+        return PredictBatchResponse(predictions=predictions, not_found=not_found)
+    
+    except Exception as e:
+        logger.error(f"Batch prediction error: {e}", exc_info=True)
+        raise HTTPException(status_code=500, detail=f"Batch prediction failed: {str(e)}")
+
+
+@app.post("/predict", response_model=PredictResponse)
+async def predict(request: PredictRequest):
+    """Predict delay risk for a station."""
+    cached = get_cached_prediction(request)
+    if cached is not None:
+        return cached
+    
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(app.state.model_pool, _do_predict, request)
+
+
+@app.post("/predict_batch", response_model=PredictBatchResponse)
+async def predict_batch(batch: List[PredictRequest]):
+    """Predict delay risk for several stations with a single model call.
+    
+    Stations without data are reported in `not_found` instead of failing the batch.
+    Cached stations are served from the prediction cache and skip the model call.
+    """
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(app.state.model_pool, _do_predict_batch, batch)
+
+
+if __name__ == "__main__":
+    import uvicorn
+    
+    # Worker processes read API_WORKERS back to size their database pools
+    workers = get_api_workers()
+    os.environ["API_WORKERS"] = str(workers)
+    
+    uvicorn.run(
+        "app.main:app",
+        host=os.getenv("API_HOST", "0.0.0.0"),
+        port=int(os.getenv("API_PORT", "8000")),
+        workers=workers,
+        loop="uvloop",
+        http="httptools"
+    )
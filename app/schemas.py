@@ -1,6 +1,6 @@
 from pydantic import BaseModel
 from datetime import datetime
-from typing import Dict
+from typing import Dict, List
 
 
 class PredictRequest(BaseModel):
@@ -20,3 +20,7 @@ class PredictResponse(BaseModel):
     risk_probability: float
     features: Dict[str, float]
 
+
+class PredictBatchResponse(BaseModel):
+    predictions: List[PredictResponse]
+    not_found: List[PredictRequest]
@@ -1,5 +1,6 @@
 import streamlit as st
 import requests
+from requests.adapters import HTTPAdapter
 import pandas as pd
 from datetime import datetime
 from typing import List, Dict, Tuple
@@ -40,32 +41,49 @@ TRACKED_STOPS: List[Tuple[str, str]] = [
 ]
 
 
+@st.cache_resource
+def get_session() -> requests.Session:
+    """Get a pooled HTTP session shared across Streamlit reruns."""
+    session = requests.Session()
+    adapter = HTTPAdapter(pool_connections=32, pool_maxsize=32, max_retries=0)
+    session.mount("http://", adapter)
+    session.mount("https://", adapter)
+    return session
+
+
 def fetch_predictions(stops: List[Tuple[str, str]], api_url: str) -> List[Dict]:
-    """Fetch predictions from API for given stops."""
+    """Fetch predictions from API for given stops in a single batch request."""
     predictions = []
     
-    for line_id, stop_id in stops:
-        try:
-            response = requests.post(
-                f"{api_url}/predict",
-                json={"line_id": line_id, "stop_id": stop_id},
-                timeout=5
-            )
-            
-            if response.status_code == 200:
-                data = response.json()
-                predictions.append({
-                    "line_id": data["line_id"],
-                    "stop_id": data["stop_id"],
-                    "risk_probability": data["risk_probability"],
-                    "risk_label": data["risk_label"],
-                    "as_of": data["as_of"]
-                })
-            else:
-                st.warning(f"Failed to get prediction for {line_id}/{stop_id}: {response.status_code}")
+    if not stops:
+        return predictions
+    
+    try:
+        response = get_session().post(
+            f"{api_url}/predict_batch",
+            json=[{"line_id": line_id, "stop_id": stop_id} for line_id, stop_id in stops],
+            timeout=10
+        )
         
-        except requests.exceptions.RequestException as e:
-            st.warning(f"Error fetching prediction for {line_id}/{stop_id}: {str(e)}")
+        if response.status_code != 200:
+            st.warning(f"Failed to get predictions: {response.status_code}")
+            return predictions
+        
+        data = response.json()
+        for item in data["predictions"]:
+            predictions.append({
+                "line_id": item["line_id"],
+                "stop_id": item["stop_id"],
+                "risk_probability": item["risk_probability"],
+                "risk_label": item["risk_label"],
+                "as_of": item["as_of"]
+            })
+        
+        for item in data["not_found"]:
+            st.warning(f"Failed to get prediction for {item['line_id']}/{item['stop_id']}: no data")
+    
+    except requests.exceptions.RequestException as e:
+        st.warning(f"Error fetching predictions: {str(e)}")
     
     return predictions
 
@@ -99,7 +117,7 @@ def main():
     
     # Check API health
     try:
-        health_response = requests.get(f"{API_URL}/health", timeout=2)
+        health_response = get_session().get(f"{API_URL}/health", timeout=2)
         if health_response.status_code != 200:
             st.error(f"API health check failed. Status: {health_response.status_code}")
             st.stop()
@@ -53,4 +53,6 @@ CREATE TABLE IF NOT EXISTS mta.station_minute_facts (
 -- Indexes for station_minute_facts
 CREATE INDEX IF NOT EXISTS idx_station_facts_bucket ON mta.station_minute_facts(bucket_start);
 CREATE INDEX IF NOT EXISTS idx_station_facts_line_stop ON mta.station_minute_facts(line_id, stop_id);
+-- Serves online feature lookups: latest bucket and trailing windows per station
+CREATE INDEX IF NOT EXISTS idx_station_facts_station_bucket ON mta.station_minute_facts(line_id, stop_id, bucket_size_seconds, bucket_start DESC);
 
@@ -1,6 +1,7 @@
 import sys
 import os
 import logging
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 
 sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
@@ -17,9 +18,12 @@ def main():
     
     bucket_sizes = [60, 300]
     
-    for bucket_size in bucket_sizes:
-        logger.info(f"Processing {bucket_size}-second buckets...")
-        rowcount = upsert_facts(bucket_size, window_minutes)
+    # Each bucket size is an independent DB-bound upsert, so run them concurrently
+    logger.info(f"Processing {', '.join(str(b) for b in bucket_sizes)}-second buckets...")
+    with ThreadPoolExecutor(max_workers=len(bucket_sizes)) as executor:
+        rowcounts = list(executor.map(lambda b: upsert_facts(b, window_minutes), bucket_sizes))
+    
+    for bucket_size, rowcount in zip(bucket_sizes, rowcounts):
         if rowcount >= 0:
             logger.info(f"  {bucket_size}s buckets: {rowcount} rows affected")
         else:
@@ -1,16 +1,55 @@
 import sys
 import os
+import json
 import logging
 from pathlib import Path
 
 sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
 
+import numpy as np
 from nyc_delay_risk.dataset.build import load_facts, create_features, create_label
 from nyc_delay_risk.dataset.split import time_split
+from nyc_delay_risk.training.train import get_feature_columns
 
 logging.basicConfig(level=logging.INFO, format="%(levelname)s: %(message)s")
 logger = logging.getLogger(__name__)
 
+# zstd decodes about as fast as snappy and compresses these count columns much
+# better; large row groups keep per-group overhead low on later scans.
+# Every column is dictionary-encoded (the small-integer counts benefit as
+# much as the station keys), and column statistics let readers skip row groups.
+PARQUET_WRITE_OPTIONS = {
+    'engine': 'pyarrow',
+    'compression': 'zstd',
+    'compression_level': 3,
+    'row_group_size': 262_144,
+    'use_dictionary': True,
+    'data_page_version': '2.0',
+    'write_statistics': True,
+}
+
+
+def compact_dtypes(df):
+    """Shrink columns before writing: categorical station keys and 32-bit numbers.
+    
+    Counts, rolling sums and time features are small, so 32-bit integers and
+    floats represent them exactly. Only 64-bit columns are narrowed; columns
+    that are already smaller (e.g. int8 time features) are left as they are.
+    """
+    df = df.copy()
+    
+    for col in ('line_id', 'stop_id'):
+        df[col] = df[col].astype('category')
+    
+    for col in df.select_dtypes(include='integer').columns:
+        if df[col].dtype.itemsize > 4:
+            df[col] = df[col].astype(np.int32)
+    for col in df.select_dtypes(include='floating').columns:
+        if df[col].dtype.itemsize > 4:
+            df[col] = df[col].astype(np.float32)
+    
+    return df
+
 
 def main():
     logger.info("Loading facts from database...")
@@ -23,6 +62,9 @@ def main():
     logger.info("Creating labels...")
     df = create_label(df)
     
+    logger.info("Compacting column types...")
+    df = compact_dtypes(df)
+    
     logger.info("Splitting into train/val/test...")
     train_df, val_df, test_df = time_split(df)
     
@@ -32,9 +74,15 @@ def main():
     
     # Save parquet files
     logger.info("Saving datasets...")
-    train_df.to_parquet(data_dir / "train.parquet", index=False)
-    val_df.to_parquet(data_dir / "val.parquet", index=False)
-    test_df.to_parquet(data_dir / "test.parquet", index=False)
+    train_df.to_parquet(data_dir / "train.parquet", index=False, **PARQUET_WRITE_OPTIONS)
+    val_df.to_parquet(data_dir / "val.parquet", index=False, **PARQUET_WRITE_OPTIONS)
+    test_df.to_parquet(data_dir / "test.parquet", index=False, **PARQUET_WRITE_OPTIONS)
+    
+    # Persist the feature list so training can read just those columns
+    feature_cols = get_feature_columns(df)
+    with open(data_dir / "feature_cols.json", 'w') as f:
+        json.dump(feature_cols, f, indent=2)
+    logger.info(f"Saved {len(feature_cols)} feature columns to {data_dir / 'feature_cols.json'}")
     
     # Print statistics
     logger.info("\n=== Dataset Statistics ===")
@@ -5,7 +5,8 @@ from pathlib import Path
 # Add src to path
 sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
 
-from nyc_delay_risk.db import get_conn, query_one
+from psycopg.rows import dict_row
+from nyc_delay_risk.db import connect_direct
 
 logging.basicConfig(level=logging.INFO, format="%(message)s")
 logger = logging.getLogger(__name__)
@@ -14,16 +15,21 @@ logger = logging.getLogger(__name__)
 def main():
     try:
         logger.info("Connecting to database...")
-        with get_conn() as conn:
+        # A direct connection reports connect errors right away, where the
+        # pool would only time out waiting for a connection
+        with connect_direct() as conn:
             logger.info("Connection established.")
-        
-        logger.info("Running connection test query...")
-        result = query_one("SELECT 1 as ok")
-        logger.info(f"Connection test passed: {result}")
-        
-        logger.info("Checking schema...")
-        count_result = query_one("SELECT COUNT(*) AS n FROM mta.raw_events")
-        logger.info(f"Table mta.raw_events exists. Current row count: {count_result['n']}")
+            
+            with conn.cursor(row_factory=dict_row) as cur:
+                logger.info("Running connection test query...")
+                cur.execute("SELECT 1 as ok")
+                result = cur.fetchone()
+                logger.info(f"Connection test passed: {result}")
+                
+                logger.info("Checking schema...")
+                cur.execute("SELECT COUNT(*) AS n FROM mta.raw_events")
+                count_result = cur.fetchone()
+                logger.info(f"Table mta.raw_events exists. Current row count: {count_result['n']}")
         
         logger.info("Database check completed successfully.")
         return 0
@@ -1,13 +1,14 @@
 import sys
 import json
 import logging
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 from datetime import datetime, timedelta
 
 sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
 
 import numpy as np
-from nyc_delay_risk.monitoring.drift import compute_psi, get_feature_values
+from nyc_delay_risk.monitoring.drift import compute_psi_many, get_feature_values
 
 logging.basicConfig(level=logging.INFO, format="%(levelname)s: %(message)s")
 logger = logging.getLogger(__name__)
@@ -44,34 +45,43 @@ def main():
         'psi_values': {}
     }
     
-    # Compute PSI for each feature
+    # Fetch baseline and current values for every feature concurrently
+    windows = {
+        'baseline': (baseline_start, baseline_end),
+        'current': (current_start, current_end)
+    }
+    logger.info(f"\nFetching values for {len(features)} features...")
+    with ThreadPoolExecutor(max_workers=len(features) * len(windows)) as executor:
+        futures = {
+            (feature_name, window_name): executor.submit(get_feature_values, feature_name, start, end)
+            for feature_name in features
+            for window_name, (start, end) in windows.items()
+        }
+        fetched = {key: future.result() for key, future in futures.items()}
+    
+    baseline_arrays = []
+    current_arrays = []
+    psi_features = []
     for feature_name in features:
-        logger.info(f"\nComputing PSI for {feature_name}...")
-        
-        # Get baseline values
-        logger.info("  Fetching baseline values...")
-        baseline_values = get_feature_values(feature_name, baseline_start, baseline_end)
-        logger.info(f"  Baseline samples: {len(baseline_values)}")
-        
-        # Get current values
-        logger.info("  Fetching current values...")
-        current_values = get_feature_values(feature_name, current_start, current_end)
-        logger.info(f"  Current samples: {len(current_values)}")
+        baseline_values = fetched[(feature_name, 'baseline')]
+        current_values = fetched[(feature_name, 'current')]
+        logger.info(f"{feature_name}: baseline samples: {len(baseline_values)}, current samples: {len(current_values)}")
         
         if len(baseline_values) == 0 or len(current_values) == 0:
-            logger.warning(f"  Insufficient data for {feature_name}, skipping PSI calculation")
+            logger.warning(f"Insufficient data for {feature_name}, skipping PSI calculation")
             results['psi_values'][feature_name] = None
             continue
         
-        # Convert to numpy arrays
-        baseline_array = np.array(baseline_values, dtype=float)
-        current_array = np.array(current_values, dtype=float)
-        
-        # Compute PSI
-        psi = compute_psi(current_array, baseline_array, bins=10)
-        
-        logger.info(f"  PSI: {psi:.6f}")
-        results['psi_values'][feature_name] = float(psi) if not np.isnan(psi) else None
+        baseline_arrays.append(baseline_values)
+        current_arrays.append(current_values)
+        psi_features.append(feature_name)
+    
+    # Compute PSI for all features in one vectorized pass
+    if psi_features:
+        psi_values = compute_psi_many(current_arrays, baseline_arrays, bins=10)
+        for feature_name, psi in zip(psi_features, psi_values):
+            logger.info(f"PSI for {feature_name}: {psi:.6f}")
+            results['psi_values'][feature_name] = float(psi) if not np.isnan(psi) else None
     
     # Print summary
     logger.info("\n=== Drift Report Summary ===")
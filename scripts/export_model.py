@@ -0,0 +1,38 @@
+import sys
+import os
+import logging
+import joblib
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
+
+from nyc_delay_risk.serving.model_loader import save_native_model
+
+logging.basicConfig(level=logging.INFO, format="%(levelname)s: %(message)s")
+logger = logging.getLogger(__name__)
+
+
+def main():
+    """Export the pickled best model to a native format for serving.
+    
+    LightGBM models become a LightGBM text model (best_model.lgb) and
+    logistic regression becomes an .npz of its weights (best_model.npz).
+    Point the API at the result with MODEL_PATH.
+    """
+    models_dir = Path(__file__).parent.parent / "models"
+    model_path = Path(os.getenv("BEST_MODEL_PATH", str(models_dir / "best_model.pkl")))
+    
+    if not model_path.exists():
+        logger.error(f"Model not found at {model_path}")
+        return 1
+    
+    model = joblib.load(model_path)
+    output_path = save_native_model(model, model_path)
+    logger.info(f"Exported {type(model).__name__} to {output_path}")
+    logger.info(f"Serve it with MODEL_PATH={output_path}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
+
@@ -7,6 +7,7 @@ from pathlib import Path
 sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
 
 from nyc_delay_risk.ingestion.ingest import ingest_once
+from nyc_delay_risk.ingestion.parser import close_parse_executor
 
 logging.basicConfig(level=logging.INFO, format="%(levelname)s: %(message)s")
 logger = logging.getLogger(__name__)
@@ -17,18 +18,33 @@ def main():
     logger.info(f"Starting ingestion loop (interval: {poll_interval}s)")
     
     try:
+        # Schedule against a fixed-rate monotonic clock so ingest time does not
+        # accumulate into the polling cadence
+        next_tick = time.monotonic()
         while True:
             try:
                 ingest_once()
             except Exception as e:
                 logger.error(f"Ingestion cycle failed: {e}")
             
-            logger.info(f"Sleeping {poll_interval} seconds...")
-            time.sleep(poll_interval)
+            next_tick += poll_interval
+            delay = next_tick - time.monotonic()
+            if delay < 0:
+                # Skip the missed ticks instead of firing back-to-back cycles
+                logger.warning(f"Ingestion cycle overran interval by {-delay:.1f} seconds")
+                next_tick = time.monotonic()
+                delay = 0
+            
+            logger.info(f"Sleeping {delay:.1f} seconds...")
+            time.sleep(delay)
     
     except KeyboardInterrupt:
         logger.info("Ingestion loop stopped by user")
         return 0
+    
+    finally:
+        # Parse worker processes live across cycles; stop them with the loop
+        close_parse_executor()
 
 
 if __name__ == "__main__":
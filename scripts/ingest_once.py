@@ -6,6 +6,7 @@ from pathlib import Path
 sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
 
 from nyc_delay_risk.ingestion.ingest import ingest_once
+from nyc_delay_risk.ingestion.parser import close_parse_executor
 
 logging.basicConfig(level=logging.INFO, format="%(levelname)s: %(message)s")
 logger = logging.getLogger(__name__)
@@ -20,6 +21,8 @@ def main():
     except Exception as e:
         logger.error(f"Ingestion failed: {e}")
         return 1
+    finally:
+        close_parse_executor()
 
 
 if __name__ == "__main__":
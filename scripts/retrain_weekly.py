@@ -1,8 +1,8 @@
 import sys
+import os
 import subprocess
 import json
 import logging
-import shutil
 from pathlib import Path
 
 logging.basicConfig(level=logging.INFO, format="%(levelname)s: %(message)s")
@@ -16,18 +16,16 @@ def main():
     
     logger.info("=== Starting Weekly Retraining ===")
     
-    # Backup current model and metrics BEFORE training (if exists)
+    # Load current metrics (the current model stays in place until a new one is accepted)
     old_metrics_path = models_dir / "last_metrics.json"
     old_test_f1 = None
-    old_metrics_data = None
     best_model_path = models_dir / "best_model.pkl"
-    old_model_backup = models_dir / "best_model.pkl.backup"
+    
+    # New candidates are written next to the active files and only moved into place on accept
+    new_model_path = models_dir / "best_model.pkl.new"
+    new_metrics_path = models_dir / "last_metrics.json.new"
     
     if old_metrics_path.exists() and best_model_path.exists():
-        # Backup current model
-        shutil.copy(best_model_path, old_model_backup)
-        
-        # Load current metrics
         with open(old_metrics_path, 'r') as f:
             old_metrics_data = json.load(f)
         old_test_f1 = old_metrics_data.get('test_metrics', {}).get('f1', 0.0)
@@ -57,12 +55,19 @@ def main():
         [sys.executable, "scripts/train.py"],
         cwd=project_root,
         capture_output=True,
-        text=True
+        text=True,
+        env={
+            **os.environ,
+            "BEST_MODEL_PATH": str(new_model_path),
+            "METRICS_PATH": str(new_metrics_path)
+        }
     )
     
     if result.returncode != 0:
         logger.error("Training failed!")
         logger.error(result.stderr)
+        new_model_path.unlink(missing_ok=True)
+        new_metrics_path.unlink(missing_ok=True)
         return 1
     
     logger.info("Training completed successfully")
@@ -71,10 +76,10 @@ def main():
     logger.info("\nStep 3: Comparing model performance...")
     
     # Load new metrics
-    new_metrics_path = models_dir / "last_metrics.json"
     if not new_metrics_path.exists():
         logger.error(f"New metrics file not found: {new_metrics_path}")
         logger.error("Training may have failed to save metrics")
+        new_model_path.unlink(missing_ok=True)
         return 1
     
     with open(new_metrics_path, 'r') as f:
@@ -102,30 +107,46 @@ def main():
             logger.info(f"New model F1: {new_test_f1:.6f}, Current model F1: {old_test_f1:.6f}")
             logger.info(f"Improvement: {improvement:.6f} < threshold: {improvement_threshold}")
             
-            # Restore old model and metrics
-            if old_model_backup.exists():
-                shutil.copy(old_model_backup, best_model_path)
-                logger.info("Restored previous model")
-            
-            # Restore old metrics - we need to recreate it from the data we loaded
-            if old_test_f1 is not None:
-                # Recreate old metrics file with the values we saved
-                old_metrics_restored = {
-                    'model_name': old_metrics_data.get('model_name', 'unknown'),
-                    'val_roc_auc': old_metrics_data.get('val_roc_auc', 0.0),
-                    'test_metrics': old_metrics_data.get('test_metrics', {}),
-                    'timestamp': old_metrics_data.get('timestamp', '')
-                }
-                with open(old_metrics_path, 'w') as f:
-                    json.dump(old_metrics_restored, f, indent=2)
-                logger.info("Restored previous metrics")
-            
             accept_new_model = False
     
     if accept_new_model:
+        # Atomic renames, so the active model is never partially written
+        os.replace(new_model_path, best_model_path)
+        os.replace(new_metrics_path, old_metrics_path)
         logger.info(f"New model at {best_model_path} is now active")
         logger.info(f"Test F1: {new_test_f1:.6f}")
+        
+        # A native export served via MODEL_PATH would otherwise keep the replaced model
+        native_paths = [best_model_path.with_suffix(suffix) for suffix in ('.lgb', '.npz')]
+        if any(path.exists() for path in native_paths):
+            logger.info("Re-exporting native model...")
+            result = subprocess.run(
+                [sys.executable, "scripts/export_model.py"],
+                cwd=project_root,
+                capture_output=True,
+                text=True,
+                env={**os.environ, "BEST_MODEL_PATH": str(best_model_path)}
+            )
+            
+            if result.returncode != 0:
+                # Leave the existing exports in place: MODEL_PATH may point at
+                # one, and a previous model beats none at the next restart
+                logger.error("Native model export failed!")
+                logger.error(result.stderr)
+                logger.error("Existing native exports still hold the previous model; re-run scripts/export_model.py")
+                return 1
+            
+            # Remove exports that still predate the new model (a model type
+            # change), so MODEL_PATH never loads a stale model
+            model_mtime = best_model_path.stat().st_mtime
+            for path in native_paths:
+                if path.exists() and path.stat().st_mtime < model_mtime:
+                    path.unlink()
+                    logger.info(f"Removed stale export {path}")
     else:
+        # Discard the candidate; the active model and metrics were never touched
+        new_model_path.unlink()
+        new_metrics_path.unlink()
         logger.info("Previous model remains active")
         logger.info(f"Current F1: {old_test_f1:.6f}")
     
@@ -9,6 +9,7 @@ sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
 
 import pandas as pd
 import numpy as np
+import pyarrow.parquet as pq
 import mlflow
 import mlflow.sklearn
 import mlflow.lightgbm
@@ -21,26 +22,56 @@ logging.basicConfig(level=logging.INFO, format="%(levelname)s: %(message)s")
 logger = logging.getLogger(__name__)
 
 
+def load_split(path, feature_cols, batch_size=65_536):
+    """Load a split's feature matrix and labels, reading only the needed columns.
+    
+    Row batches are streamed from the parquet file straight into a
+    preallocated float32 matrix, so the whole Arrow table is never held in
+    memory next to the matrix.
+    """
+    parquet_file = pq.ParquetFile(path, pre_buffer=True)
+    n_rows = parquet_file.metadata.num_rows
+    
+    X = np.empty((n_rows, len(feature_cols)), dtype=np.float32)
+    y = np.empty(n_rows, dtype=np.int32)
+    
+    start = 0
+    for batch in parquet_file.iter_batches(batch_size=batch_size, columns=feature_cols + ['label'], use_threads=True):
+        end = start + batch.num_rows
+        for j, col in enumerate(feature_cols):
+            X[start:end, j] = batch.column(col).to_numpy(zero_copy_only=False)
+        y[start:end] = batch.column('label').to_numpy(zero_copy_only=False)
+        start = end
+    
+    return X, y
+
+
 def main():
-    # Load data
     data_dir = Path(__file__).parent.parent / "data"
-    logger.info("Loading datasets...")
-    train_df = pd.read_parquet(data_dir / "train.parquet")
-    val_df = pd.read_parquet(data_dir / "val.parquet")
-    test_df = pd.read_parquet(data_dir / "test.parquet")
-    
-    logger.info(f"Train: {len(train_df)} rows, Val: {len(val_df)} rows, Test: {len(test_df)} rows")
     
-    # Extract features and labels
-    feature_cols = get_feature_columns(train_df)
+    # Use the feature list saved by build_dataset.py; fall back to the parquet
+    # schema (no rows read) for datasets built before it was persisted
+    feature_cols_path = data_dir / "feature_cols.json"
+    if feature_cols_path.exists():
+        with open(feature_cols_path, 'r') as f:
+            feature_cols = json.load(f)
+    else:
+        schema = pq.read_schema(data_dir / "train.parquet")
+        feature_cols = get_feature_columns(schema.empty_table().to_pandas())
     logger.info(f"Using {len(feature_cols)} features")
     
-    X_train = train_df[feature_cols].values
-    y_train = train_df['label'].values
-    X_val = val_df[feature_cols].values
-    y_val = val_df['label'].values
-    X_test = test_df[feature_cols].values
-    y_test = test_df['label'].values
+    # Time fields are small integers, so LightGBM can split on them as categories
+    categorical_feature_indices = [
+        feature_cols.index(col) for col in ('hour_of_day', 'day_of_week') if col in feature_cols
+    ]
+    
+    # Load data
+    logger.info("Loading datasets...")
+    X_train, y_train = load_split(data_dir / "train.parquet", feature_cols)
+    X_val, y_val = load_split(data_dir / "val.parquet", feature_cols)
+    X_test, y_test = load_split(data_dir / "test.parquet", feature_cols)
+    
+    logger.info(f"Train: {len(X_train)} rows, Val: {len(X_val)} rows, Test: {len(X_test)} rows")
     
     # Set MLflow experiment
     mlflow.set_experiment("nyc_delay_risk")
@@ -105,8 +136,14 @@ def main():
     # Train LightGBM
     logger.info("\n=== Training LightGBM ===")
     with mlflow.start_run(run_name="lightgbm"):
+        # Leave one core free instead of oversubscribing hyperthreads
+        n_threads = max(1, (os.cpu_count() or 2) - 1)
+        
         # Train
-        lgb_model = train_lightgbm(X_train, y_train, X_val, y_val)
+        lgb_model = train_lightgbm(
+            X_train, y_train, X_val, y_val,
+            categorical_feature=categorical_feature_indices, num_threads=n_threads
+        )
         
         # Evaluate on validation
         y_val_pred = lgb_model.predict(X_val, num_iteration=lgb_model.best_iteration)
@@ -122,6 +159,7 @@ def main():
         mlflow.log_params({
             'model': 'lightgbm',
             'objective': 'binary',
+            'num_threads': n_threads,
             'n_estimators': 500,
             'learning_rate': 0.05,
             'num_leaves': 31,
@@ -156,7 +194,7 @@ def main():
     
     # Save best model
     logger.info(f"\n=== Saving Best Model ({best_model_name}) ===")
-    best_model_path = models_dir / "best_model.pkl"
+    best_model_path = Path(os.getenv("BEST_MODEL_PATH", str(models_dir / "best_model.pkl")))
     joblib.dump(best_model, best_model_path)
     logger.info(f"Best model saved to {best_model_path}")
     logger.info(f"Best validation ROC-AUC: {best_val_roc_auc:.4f}")
@@ -169,7 +207,7 @@ def main():
             'test_metrics': best_test_metrics,
             'timestamp': pd.Timestamp.now().isoformat()
         }
-        metrics_path = models_dir / "last_metrics.json"
+        metrics_path = Path(os.getenv("METRICS_PATH", str(models_dir / "last_metrics.json")))
         with open(metrics_path, 'w') as f:
             json.dump(metrics_data, f, indent=2)
         logger.info(f"Metrics saved to {metrics_path}")
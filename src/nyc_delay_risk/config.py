@@ -1,8 +1,23 @@
+import logging
 import os
 from dotenv import load_dotenv
 
 load_dotenv()
 
+logger = logging.getLogger(__name__)
+
+
+def _available_cpus() -> int:
+    """CPUs this process may run on (affinity-aware, unlike os.cpu_count)."""
+    try:
+        return len(os.sched_getaffinity(0)) or 1
+    except AttributeError:
+        return os.cpu_count() or 1
+
+
+def _default_db_pool_max_size() -> int:
+    return min(32, _available_cpus() * 2)
+
 
 def get_db_dsn() -> str:
     """Build PostgreSQL connection string from environment variables."""
@@ -21,3 +36,47 @@ def get_db_dsn() -> str:
     
     return f"postgresql://{db_user}:{db_password}@{db_host}:{db_port}/{db_name}"
 
+
+def get_db_pool_total_size() -> int:
+    """Connection budget for the whole service (DB_POOL_MAX_SIZE)."""
+    return max(1, int(os.getenv("DB_POOL_MAX_SIZE", str(_default_db_pool_max_size()))))
+
+
+def get_api_workers() -> int:
+    """Number of uvicorn worker processes serving the API.
+    
+    Defaults to one per available CPU, capped at the connection budget so
+    every worker can hold at least one pooled connection.
+    """
+    default_workers = min(_available_cpus(), get_db_pool_total_size())
+    return max(1, int(os.getenv("API_WORKERS", str(default_workers))))
+
+
+def get_db_pool_max_size(workers: int = 1) -> int:
+    """Maximum number of pooled database connections per process.
+    
+    DB_POOL_MAX_SIZE is the connection budget for the whole service; with
+    several worker processes each one gets an equal share of it, so the
+    pools together never hold more than the budget. When there are more
+    workers than connections each still gets one, and the total is exceeded.
+    """
+    total_size = get_db_pool_total_size()
+    if workers <= 1:
+        return total_size
+    if workers > total_size:
+        logger.warning(
+            f"API_WORKERS={workers} exceeds DB_POOL_MAX_SIZE={total_size}; "
+            f"opening {workers} connections, one per worker"
+        )
+        return 1
+    return total_size // workers
+
+
+def get_parse_workers() -> int:
+    """Number of processes used to parse fetched feeds (1 parses inline)."""
+    return max(1, int(os.getenv("PARSE_WORKERS", "1")))
+
+
+def get_parse_cache_size() -> int:
+    """Parsed feeds kept per process for replayed input (0, the default, disables the cache)."""
+    return max(0, int(os.getenv("PARSE_CACHE_SIZE", "0")))
@@ -1,14 +1,21 @@
+import numpy as np
 import pandas as pd
 from ..db import get_conn
 
 
 def load_facts():
-    """Load 60-second bucket facts from database, filtered and sorted."""
+    """Load 60-second bucket facts from database, filtered and sorted.
+    
+    Only the columns used for features are fetched, rows without any station
+    key are dropped in SQL, and rows arrive ordered by station and time.
+    """
     sql = """
-        SELECT *
+        SELECT bucket_start, line_id, stop_id, alerts_count, major_alerts_count,
+               trip_updates_count, vehicle_positions_count
         FROM mta.station_minute_facts
         WHERE bucket_size_seconds = 60
-        ORDER BY bucket_start
+          AND NOT (line_id IS NULL AND stop_id IS NULL)
+        ORDER BY line_id, stop_id, bucket_start
     """
     
     with get_conn() as conn:
@@ -17,9 +24,6 @@ def load_facts():
     # Convert bucket_start to datetime if not already
     df['bucket_start'] = pd.to_datetime(df['bucket_start'])
     
-    # Drop rows where both line_id and stop_id are NULL
-    df = df[~(df['line_id'].isna() & df['stop_id'].isna())]
-    
     return df
 
 
@@ -30,86 +34,80 @@ def create_features(df):
     # Direct features (already in dataframe)
     # alerts_count, trip_updates_count, vehicle_positions_count
     
-    # Time features from bucket_start (UTC)
-    df['hour_of_day'] = df['bucket_start'].dt.hour
-    df['day_of_week'] = df['bucket_start'].dt.dayofweek  # Monday=0
+    # Time features from bucket_start (UTC), computed on the int64 epoch ticks
+    bucket_ticks = df['bucket_start'].array.asi8
+    ticks_per_second = np.timedelta64(1, 's') // np.timedelta64(1, df['bucket_start'].array.unit)
+    epoch_hours = bucket_ticks // (3600 * ticks_per_second)
+    df['hour_of_day'] = (epoch_hours % 24).astype(np.int8)
+    df['day_of_week'] = ((epoch_hours // 24 + 3) % 7).astype(np.int8)  # Monday=0 (1970-01-01 was a Thursday)
     
-    # Rolling features per (line_id, stop_id) group
-    # Set index to bucket_start for time-based rolling
-    df = df.set_index('bucket_start')
+    # Categorical station keys let sorting and grouping work on integer codes
+    df = df.astype({'line_id': 'category', 'stop_id': 'category'})
+    
+    # Rolling features per (line_id, stop_id) group; time-based windows need
+    # each group in bucket_start order
+    df = df.sort_values(['line_id', 'stop_id', 'bucket_start']).reset_index(drop=True)
     
-    # Group by station identifiers
-    grouped = df.groupby(['line_id', 'stop_id'], dropna=False)
+    # Group by station identifiers, rolling all count columns together
+    count_cols = ['alerts_count', 'trip_updates_count', 'vehicle_positions_count']
+    grouped = df.groupby(['line_id', 'stop_id'], dropna=False, sort=False, observed=True)[count_cols + ['bucket_start']]
     
     # Rolling backward windows (past 15min and 60min)
-    rolling_features = {}
     for window in ['15min', '60min']:
         suffix = window.replace('min', 'm')
+        rolling_sums = grouped.rolling(window, on='bucket_start', closed='left').sum()
         
-        rolling_features[f'alerts_sum_{suffix}'] = grouped['alerts_count'].rolling(
-            window, closed='left'
-        ).sum()
-        
-        rolling_features[f'trip_updates_sum_{suffix}'] = grouped['trip_updates_count'].rolling(
-            window, closed='left'
-        ).sum()
-        
-        rolling_features[f'vehicle_positions_sum_{suffix}'] = grouped['vehicle_positions_count'].rolling(
-            window, closed='left'
-        ).sum()
-    
-    # Add rolling features to dataframe and reset index
-    for col_name, series in rolling_features.items():
-        # Reset groupby index levels (line_id, stop_id) but keep bucket_start index
-        df[col_name] = series.reset_index(level=[0, 1], drop=True)
-    
-    # Reset index to bring bucket_start back as column
-    df = df.reset_index()
+        # Groups with NULL keys do not come back in df's order, so align the
+        # sums on the row index (the last index level) rather than by position
+        rolling_sums = rolling_sums[count_cols].droplevel([0, 1]).reindex(df.index)
+        df[[f'alerts_sum_{suffix}', f'trip_updates_sum_{suffix}', f'vehicle_positions_sum_{suffix}']] = (
+            rolling_sums.to_numpy()
+        )
     
     return df
 
 
+# Label horizon in seconds
+LABEL_HORIZON_SECONDS = 15 * 60
+
+
 def create_label(df):
     """Create binary label: 1 if alerts_count > 0 occurs in next 15 minutes.
     
     Method: For each row at time t, check if any future row exists where
     bucket_start is in (t, t+15min] and alerts_count > 0, for the same
-    (line_id, stop_id). Uses groupby and time-based filtering per station.
+    (line_id, stop_id). Rows are encoded as one sorted int64 key (station
+    group, seconds since start), so each window's bounds are found with a
+    binary search and its alert count with a prefix sum.
     """
-    df = df.copy()
+    # Categorical station keys, as in create_features (a no-op on its output)
+    df = df.astype({'line_id': 'category', 'stop_id': 'category'})
     
     # Ensure sorted by bucket_start
     df = df.sort_values(['line_id', 'stop_id', 'bucket_start']).reset_index(drop=True)
     
-    # Create labels by checking future alerts within 15 minutes for each group
-    labels = []
+    if len(df) == 0:
+        df['label'] = np.array([], dtype=np.int8)
+        return df
     
-    for (line_id, stop_id), group in df.groupby(['line_id', 'stop_id'], dropna=False):
-        group = group.sort_values('bucket_start').reset_index(drop=True)
-        
-        # Get rows with alerts for this station
-        alert_rows = group[group['alerts_count'] > 0].copy()
-        
-        group_labels = []
-        for idx, row in group.iterrows():
-            current_time = row['bucket_start']
-            future_window_end = current_time + pd.Timedelta(minutes=15)
-            
-            # Check if any alert exists in the future window
-            if len(alert_rows) > 0:
-                future_alerts = alert_rows[
-                    (alert_rows['bucket_start'] > current_time) &
-                    (alert_rows['bucket_start'] <= future_window_end)
-                ]
-                has_future_alert = len(future_alerts) > 0
-            else:
-                has_future_alert = False
-            
-            group_labels.append(1 if has_future_alert else 0)
-        
-        labels.extend(group_labels)
+    # Bucket starts are whole seconds; the group stride is wider than any
+    # offset plus the horizon, so a window never spills into the next group
+    group_codes = df.groupby(['line_id', 'stop_id'], dropna=False, sort=False, observed=True).ngroup().to_numpy(dtype=np.int64)
+    bucket_ticks = df['bucket_start'].array.asi8
+    ticks_per_second = np.timedelta64(1, 's') // np.timedelta64(1, df['bucket_start'].array.unit)
+    offsets = (bucket_ticks - bucket_ticks.min()) // ticks_per_second
+    stride = offsets.max() + LABEL_HORIZON_SECONDS + 1
+    keys = group_codes * stride + offsets
+    
+    # alerts_seen[i] = number of alert rows before row i
+    alerts_seen = np.zeros(len(df) + 1, dtype=np.int64)
+    np.cumsum(df['alerts_count'].to_numpy() > 0, out=alerts_seen[1:])
+    
+    # Rows in (t, t + horizon] for the same station span [window_start, window_end)
+    window_start = np.searchsorted(keys, keys, side='right')
+    window_end = np.searchsorted(keys, keys + LABEL_HORIZON_SECONDS, side='right')
     
-    df['label'] = labels
+    df['label'] = (alerts_seen[window_end] > alerts_seen[window_start]).astype(np.int8)
     
     return df
 
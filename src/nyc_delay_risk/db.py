@@ -1,11 +1,65 @@
+import atexit
+import threading
 import psycopg
 from psycopg.rows import dict_row
-from .config import get_db_dsn
+from psycopg_pool import ConnectionPool
+from .config import get_db_dsn, get_db_pool_max_size
+
+# Module-level connection pool, created on first use
+_pool = None
+_pool_lock = threading.Lock()
+
+
+def init_pool(workers: int = 1) -> ConnectionPool:
+    """Create the process-wide connection pool if it does not exist yet.
+    
+    workers is the number of processes sharing the DB_POOL_MAX_SIZE budget.
+    """
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            # Statements run prepare_threshold times on a connection are
+            # prepared server-side, skipping parse/plan on later executions
+            max_size = get_db_pool_max_size(workers)
+            _pool = ConnectionPool(
+                get_db_dsn(),
+                min_size=min(2, max_size),
+                max_size=max_size,
+                kwargs={'prepare_threshold': 5},
+                open=True
+            )
+        return _pool
+
+
+def close_pool() -> None:
+    """Close the connection pool and all of its connections."""
+    global _pool
+    with _pool_lock:
+        if _pool is not None:
+            _pool.close()
+            _pool = None
+
+
+atexit.register(close_pool)
+
+
+def connect_direct(connect_timeout: int = 5) -> psycopg.Connection:
+    """Open a dedicated, unpooled connection that fails fast.
+    
+    Connection errors (bad DSN, unreachable host) are raised within
+    connect_timeout seconds instead of surfacing as a pool timeout.
+    """
+    return psycopg.connect(get_db_dsn(), connect_timeout=connect_timeout)
 
 
 def get_conn():
-    """Get a PostgreSQL connection."""
-    return psycopg.connect(get_db_dsn())
+    """Get a pooled PostgreSQL connection.
+    
+    Use as a context manager: the transaction is committed (or rolled back on
+    error) and the connection is returned to the pool on exit.
+    """
+    pool = _pool if _pool is not None else init_pool()
+    return pool.connection()
 
 
 def query_one(sql: str, params: tuple = ()):
@@ -14,4 +68,3 @@ def query_one(sql: str, params: tuple = ()):
         with conn.cursor(row_factory=dict_row) as cur:
             cur.execute(sql, params)
             return cur.fetchone()
-
@@ -1,8 +1,19 @@
 import requests
 import logging
+from requests.adapters import HTTPAdapter
+from urllib3.util.request import ACCEPT_ENCODING
 
 logger = logging.getLogger(__name__)
 
+# Shared session so feeds fetched concurrently reuse pooled TCP/TLS connections
+_SESSION = requests.Session()
+_SESSION.mount("http://", HTTPAdapter(pool_connections=16, pool_maxsize=16))
+_SESSION.mount("https://", HTTPAdapter(pool_connections=16, pool_maxsize=16))
+# requests only offers gzip/deflate by default; also offer br and zstd when
+# urllib3 has those decoders installed (brotli/zstandard), so
+# response.content is still decompressed transparently
+_SESSION.headers.update({"Accept-Encoding": ACCEPT_ENCODING})
+
 
 def fetch_bytes(url: str, api_key: str | None = None) -> bytes:
     """Fetch bytes from URL with optional API key authentication.
@@ -17,7 +28,7 @@ def fetch_bytes(url: str, api_key: str | None = None) -> bytes:
         headers["x-api-key"] = api_key
     
     try:
-        response = requests.get(url, headers=headers, timeout=timeout)
+        response = _SESSION.get(url, headers=headers, timeout=timeout)
         response.raise_for_status()
         return response.content
     
@@ -28,7 +39,7 @@ def fetch_bytes(url: str, api_key: str | None = None) -> bytes:
                 logger.info(f"Header auth failed ({e.response.status_code}), retrying with query param")
                 try:
                     retry_url = f"{url}?api_key={api_key}"
-                    response = requests.get(retry_url, timeout=timeout)
+                    response = _SESSION.get(retry_url, timeout=timeout)
                     response.raise_for_status()
                     return response.content
                 except requests.RequestException as retry_err:
@@ -1,10 +1,13 @@
 import os
-import json
 import uuid
 import logging
+import orjson
+from concurrent.futures import ThreadPoolExecutor
+from psycopg.types.json import Jsonb
+from ..config import get_parse_workers
 from ..db import get_conn
 from .client import fetch_bytes
-from .parser import parse_feed
+from .parser import EntityColumns, parse_feeds
 
 logger = logging.getLogger(__name__)
 
@@ -33,35 +36,57 @@ def finish_run(run_id: uuid.UUID, status: str, notes: str | None = None) -> None
             conn.commit()
 
 
-def insert_raw_events(run_id: uuid.UUID, feed_type: str, feed_ts, entities: list[dict]) -> int:
-    """Insert raw events using executemany. Returns count of inserted rows."""
-    if not entities:
+# Column types for binary COPY into mta.raw_events
+RAW_EVENT_COPY_TYPES = ['uuid', 'text', 'text', 'timestamptz', 'text', 'text', 'text', 'jsonb']
+
+
+def insert_raw_events(run_id: uuid.UUID, feed_type: str, feed_ts, entities: EntityColumns) -> int:
+    """Insert raw events with a single COPY. Returns count of inserted rows."""
+    return insert_raw_event_batches(run_id, [(feed_type, feed_ts, entities)])
+
+
+def insert_raw_event_batches(run_id: uuid.UUID, batches: list[tuple]) -> int:
+    """Insert raw events from several feeds with one binary COPY in one transaction.
+    
+    Args:
+        batches: (feed_type, feed_ts, EntityColumns) per feed
+    
+    Returns:
+        int: count of inserted rows
+    """
+    if not any(entities.entity_ids for _, _, entities in batches):
         return 0
     
-    insert_sql = """
-        INSERT INTO mta.raw_events 
+    copy_sql = """
+        COPY mta.raw_events
         (run_id, feed_type, entity_id, event_ts, line_id, stop_id, trip_id, payload)
-        VALUES (%s, %s, %s, %s, %s, %s, %s, %s::jsonb)
+        FROM STDIN WITH (FORMAT BINARY)
     """
     
-    rows = []
-    for entity in entities:
-        rows.append((
-            run_id,
-            feed_type,
-            entity.get("entity_id"),
-            feed_ts,
-            entity.get("line_id"),
-            entity.get("stop_id"),
-            entity.get("trip_id"),
-            json.dumps(entity.get("payload"))
-        ))
-    
+    count = 0
     with get_conn() as conn:
         with conn.cursor() as cur:
-            cur.executemany(insert_sql, rows)
+            # Rows are streamed to the server as they are built
+            with cur.copy(copy_sql) as copy:
+                copy.set_types(RAW_EVENT_COPY_TYPES)
+                for feed_type, feed_ts, entities in batches:
+                    for entity_id, line_id, stop_id, trip_id, payload in zip(
+                        entities.entity_ids, entities.line_ids, entities.stop_ids,
+                        entities.trip_ids, entities.payloads
+                    ):
+                        copy.write_row((
+                            run_id,
+                            feed_type,
+                            entity_id,
+                            feed_ts,
+                            line_id,
+                            stop_id,
+                            trip_id,
+                            Jsonb(payload, dumps=orjson.dumps)
+                        ))
+                    count += len(entities.entity_ids)
             conn.commit()
-            return len(rows)
+            return count
 
 
 def ingest_once() -> dict:
@@ -93,20 +118,27 @@ def ingest_once() -> dict:
     }
     
     try:
-        total_entities = 0
+        # Fetch all feeds concurrently; they are independent, RTT-bound GETs
+        feed_urls = [service_alerts_url] + realtime_urls
+        logger.info(f"Fetching {len(feed_urls)} feeds")
+        with ThreadPoolExecutor(max_workers=min(16, len(feed_urls))) as executor:
+            fetches = [executor.submit(fetch_bytes, url, api_key) for url in feed_urls]
+            feed_bytes_list = [fetch.result() for fetch in fetches]
         
-        # Fetch and process service alerts
-        logger.info(f"Fetching service alerts from {service_alerts_url}")
-        feed_bytes = fetch_bytes(service_alerts_url, api_key)
-        feed_ts, entities = parse_feed(feed_bytes)
+        # Parse all feeds up front, across processes if PARSE_WORKERS > 1
+        parsed_feeds = parse_feeds(feed_bytes_list, max_workers=get_parse_workers())
+        
+        # Process service alerts
+        logger.info(f"Fetched service alerts from {service_alerts_url}")
+        feed_ts, entities = parsed_feeds[0]
         
         # Filter only service_alerts entities
-        alerts_entities = [e for e in entities if e.get("entity_type") == "service_alerts"]
-        logger.info(f"Inserting {len(alerts_entities)} service alerts")
-        alerts_count = insert_raw_events(run_id, "service_alerts", feed_ts, alerts_entities)
-        total_entities += alerts_count
+        alerts_entities = entities.of_type("service_alerts")
+        logger.info(f"Queued {len(alerts_entities.entity_ids)} service alerts")
+        # All feeds of the cycle are buffered and written with one COPY
+        batches = [("service_alerts", feed_ts, alerts_entities)]
         summary["feeds"]["service_alerts"] = {
-            "entities": alerts_count,
+            "entities": len(alerts_entities.entity_ids),
             "feed_ts": feed_ts.isoformat()
         }
         
@@ -114,28 +146,27 @@ def ingest_once() -> dict:
         trip_updates_total = 0
         vehicle_positions_total = 0
         
-        for feed_url in realtime_urls:
-            logger.info(f"Fetching realtime feed from {feed_url}")
-            feed_bytes = fetch_bytes(feed_url, api_key)
-            feed_ts, entities = parse_feed(feed_bytes)
+        for feed_url, (feed_ts, entities) in zip(realtime_urls, parsed_feeds[1:]):
+            logger.info(f"Fetched realtime feed from {feed_url}")
             
             # Separate entities by type
-            trip_updates_entities = [e for e in entities if e.get("entity_type") == "trip_updates"]
-            vehicle_positions_entities = [e for e in entities if e.get("entity_type") == "vehicle_positions"]
+            trip_updates_entities = entities.of_type("trip_updates")
+            vehicle_positions_entities = entities.of_type("vehicle_positions")
             
-            # Insert trip updates
-            if trip_updates_entities:
-                logger.info(f"Inserting {len(trip_updates_entities)} trip updates from {feed_url}")
-                count = insert_raw_events(run_id, "trip_updates", feed_ts, trip_updates_entities)
-                trip_updates_total += count
-                total_entities += count
+            # Queue trip updates
+            if trip_updates_entities.entity_ids:
+                logger.info(f"Queued {len(trip_updates_entities.entity_ids)} trip updates from {feed_url}")
+                batches.append(("trip_updates", feed_ts, trip_updates_entities))
+                trip_updates_total += len(trip_updates_entities.entity_ids)
             
-            # Insert vehicle positions
-            if vehicle_positions_entities:
-                logger.info(f"Inserting {len(vehicle_positions_entities)} vehicle positions from {feed_url}")
-                count = insert_raw_events(run_id, "vehicle_positions", feed_ts, vehicle_positions_entities)
-                vehicle_positions_total += count
-                total_entities += count
+            # Queue vehicle positions
+            if vehicle_positions_entities.entity_ids:
+                logger.info(f"Queued {len(vehicle_positions_entities.entity_ids)} vehicle positions from {feed_url}")
+                batches.append(("vehicle_positions", feed_ts, vehicle_positions_entities))
+                vehicle_positions_total += len(vehicle_positions_entities.entity_ids)
+        
+        logger.info(f"Inserting {sum(len(entities.entity_ids) for _, _, entities in batches)} raw events")
+        total_entities = insert_raw_event_batches(run_id, batches)
         
         summary["feeds"]["trip_updates"] = {
             "entities": trip_updates_total,
@@ -1,81 +1,363 @@
+import base64
+import hashlib
+import math
+import multiprocessing
+import struct
+import threading
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor
+from typing import NamedTuple
 from google.transit import gtfs_realtime_pb2
-from google.protobuf.json_format import MessageToDict
+from google.protobuf.descriptor import FieldDescriptor
+from ..config import get_parse_cache_size
 from ..utils.time import from_epoch_seconds
 
+_INT64_CPP_TYPES = (FieldDescriptor.CPPTYPE_INT64, FieldDescriptor.CPPTYPE_UINT64)
+_FLOAT_CPP_TYPES = (FieldDescriptor.CPPTYPE_FLOAT, FieldDescriptor.CPPTYPE_DOUBLE)
+
+# (key, is_repeated, value converter or None) per field descriptor, built on first use
+_FIELD_PLANS = {}
+
+# Enum number -> name tables per enum descriptor, shared by all fields of that enum
+_ENUM_NAMES = {}
+
+
+class EntityColumns(NamedTuple):
+    """Parsed feed entities stored column-wise, one tuple per field.
+    
+    entity_types holds 'service_alerts', 'trip_updates' or 'vehicle_positions'.
+    """
+    entity_ids: tuple
+    payloads: tuple
+    line_ids: tuple
+    stop_ids: tuple
+    trip_ids: tuple
+    entity_types: tuple
+    
+    def of_type(self, entity_type: str) -> 'EntityColumns':
+        """Columns restricted to entities of one type."""
+        keep = [i for i, value in enumerate(self.entity_types) if value == entity_type]
+        return EntityColumns(*(tuple(column[i] for i in keep) for column in self))
+
+
+# Parsed feeds keyed by a digest of their bytes, so replayed feeds are not
+# parsed again; least recently used entries are evicted. Each entry holds a
+# whole feed's payload dicts (megabytes), and live polling never sees the
+# same bytes twice, so the cache is off unless PARSE_CACHE_SIZE is set for
+# replay/backfill runs
+PARSE_CACHE_SIZE = get_parse_cache_size()
+_parse_cache = OrderedDict()
+_parse_cache_lock = threading.Lock()
+
+# Worker processes for parse_feeds, created on first use and kept across
+# ingest cycles. Workers start from a forkserver (or spawn) rather than a
+# fork of this process, which by then runs database pool threads and holds
+# open connections
+_parse_executor = None
+_parse_executor_workers = 0
+_parse_executor_lock = threading.Lock()
+
+
+def _convert_float(value):
+    if math.isnan(value):
+        return 'NaN'
+    if math.isinf(value):
+        return '-Infinity' if value < 0.0 else 'Infinity'
+    return value
+
+
+def _shortest_float32(value: float) -> float:
+    """Shortest decimal that rounds to the same 4-byte float, as MessageToDict prints floats."""
+    # Float32 values need between 6 and 9 significant digits
+    for precision in range(6, 10):
+        rounded = float(f"{value:.{precision}g}")
+        if struct.unpack('<f', struct.pack('<f', rounded))[0] == value:
+            return rounded
+    return value
+
+
+def _convert_float32(value):
+    value = _convert_float(value)
+    return value if isinstance(value, str) else _shortest_float32(value)
+
+
+def _is_repeated(field) -> bool:
+    # FieldDescriptor.label was removed in protobuf 7 in favour of is_repeated
+    is_repeated = getattr(field, 'is_repeated', None)
+    if is_repeated is None:
+        return field.label == FieldDescriptor.LABEL_REPEATED
+    return is_repeated
+
+
+def _enum_converter(enum_type):
+    """Map enum numbers to names like MessageToDict; unknown numbers pass through."""
+    names = _ENUM_NAMES.get(enum_type)
+    if names is None:
+        names = _ENUM_NAMES[enum_type] = {
+            number: value.name for number, value in enum_type.values_by_number.items()
+        }
+    return lambda value: names.get(value, value)
+
+
+def _plan_field(field):
+    """Resolve how a field is keyed and converted, matching MessageToDict."""
+    is_repeated = _is_repeated(field)
+    key = f"[{field.full_name}]" if field.is_extension and not is_repeated else field.name
+    
+    if field.cpp_type == FieldDescriptor.CPPTYPE_MESSAGE:
+        convert = _message_to_dict
+    elif field.cpp_type == FieldDescriptor.CPPTYPE_ENUM:
+        convert = _enum_converter(field.enum_type)
+    elif field.type == FieldDescriptor.TYPE_BYTES:
+        convert = lambda value: base64.b64encode(value).decode('utf-8')
+    elif field.cpp_type in _INT64_CPP_TYPES:
+        convert = str
+    elif field.cpp_type == FieldDescriptor.CPPTYPE_FLOAT:
+        convert = _convert_float32
+    elif field.cpp_type in _FLOAT_CPP_TYPES:
+        convert = _convert_float
+    else:
+        # Strings, bools and 32-bit ints are already JSON-ready
+        convert = None
+    
+    return key, is_repeated, convert
+
+
+def _message_to_dict(message) -> dict:
+    """Convert a message to the same dict as MessageToDict(preserving_proto_field_name=True).
+    
+    Only set fields are walked, and each field's conversion is resolved once per
+    descriptor instead of being re-dispatched for every value. GTFS-RT uses no
+    maps or well-known types, so those MessageToDict special cases are not needed.
+    """
+    return _fields_to_dict(message.ListFields())
+
+
+def _fields_to_dict(fields) -> dict:
+    """Convert the (descriptor, value) pairs of message.ListFields() to a dict."""
+    result = {}
+    for field, value in fields:
+        plan = _FIELD_PLANS.get(field)
+        if plan is None:
+            plan = _FIELD_PLANS[field] = _plan_field(field)
+        key, is_repeated, convert = plan
+        
+        if is_repeated:
+            result[key] = [convert(item) for item in value] if convert else list(value)
+        else:
+            result[key] = convert(value) if convert else value
+    
+    return result
+
+
+def _handle_alert(alert) -> tuple:
+    line_id = None
+    stop_id = None
+    for informed_entity in alert.informed_entity:
+        if line_id is None and informed_entity.HasField("route_id"):
+            line_id = informed_entity.route_id
+        if stop_id is None and informed_entity.HasField("stop_id"):
+            stop_id = informed_entity.stop_id
+        if line_id is not None and stop_id is not None:
+            break
+    return "service_alerts", line_id, stop_id, None
+
+
+def _handle_trip_update(trip_update) -> tuple:
+    line_id = None
+    stop_id = None
+    trip_id = None
+    if trip_update.trip.HasField("route_id"):
+        line_id = trip_update.trip.route_id
+    if trip_update.trip.HasField("trip_id"):
+        trip_id = trip_update.trip.trip_id
+    # The first stop_time_update almost always carries the stop_id (a
+    # non-empty value implies HasField); only scan for the first one that
+    # has it when it is missing or empty
+    stop_time_updates = trip_update.stop_time_update
+    if stop_time_updates:
+        stop_id = stop_time_updates[0].stop_id
+        if not stop_id:
+            stop_id = next((stu.stop_id for stu in stop_time_updates if stu.HasField("stop_id")), None)
+    return "trip_updates", line_id, stop_id, trip_id
+
+
+def _handle_vehicle(vehicle) -> tuple:
+    line_id = None
+    stop_id = None
+    trip_id = None
+    if vehicle.trip.HasField("route_id"):
+        line_id = vehicle.trip.route_id
+    if vehicle.trip.HasField("trip_id"):
+        trip_id = vehicle.trip.trip_id
+    if vehicle.HasField("stop_id"):
+        stop_id = vehicle.stop_id
+    return "vehicle_positions", line_id, stop_id, trip_id
+
+
+# FeedEntity sub-message descriptor -> (precedence, handler returning
+# (entity_type, line_id, stop_id, trip_id)); lower precedence wins when
+# an entity sets more than one
+_ENTITY_HANDLERS = {
+    gtfs_realtime_pb2.FeedEntity.DESCRIPTOR.fields_by_name[field_name]: (precedence, handler)
+    for precedence, (field_name, handler) in enumerate((
+        ("alert", _handle_alert),
+        ("trip_update", _handle_trip_update),
+        ("vehicle", _handle_vehicle),
+    ))
+}
+
+
+def _feed_digest(feed_bytes: bytes) -> bytes:
+    return hashlib.blake2b(feed_bytes, digest_size=16).digest()
+
+
+def _get_cached_feed(digest: bytes):
+    with _parse_cache_lock:
+        parsed = _parse_cache.get(digest)
+        if parsed is not None:
+            _parse_cache.move_to_end(digest)
+        return parsed
+
+
+def _cache_feed(digest: bytes, parsed: tuple) -> None:
+    with _parse_cache_lock:
+        _parse_cache[digest] = parsed
+        if len(_parse_cache) > PARSE_CACHE_SIZE:
+            _parse_cache.popitem(last=False)
+
 
 def parse_feed(feed_bytes: bytes) -> tuple:
     """Parse GTFS-RT feed and extract entities with metadata and type.
     
+    When PARSE_CACHE_SIZE > 0, results are cached by content hash, so
+    parsing the same bytes again is a lookup. Cached results are returned
+    as-is: repeated calls get the same EntityColumns and the same payload
+    dicts, so callers must treat payloads as read-only.
+    
     Returns:
-        tuple: (feed_ts: datetime, entities: list[dict])
-        Each entity dict contains: entity_id, payload, line_id, stop_id, trip_id, entity_type
-        entity_type is one of: 'service_alerts', 'trip_updates', 'vehicle_positions'
+        tuple: (feed_ts: datetime, entities: EntityColumns)
     """
+    if PARSE_CACHE_SIZE <= 0:
+        return _parse_feed(feed_bytes)
+    
+    digest = _feed_digest(feed_bytes)
+    parsed = _get_cached_feed(digest)
+    if parsed is None:
+        parsed = _parse_feed(feed_bytes)
+        _cache_feed(digest, parsed)
+    return parsed
+
+
+def _parse_feed(feed_bytes: bytes) -> tuple:
+    """Parse a feed without the cache; returns (feed_ts, EntityColumns)."""
     feed_message = gtfs_realtime_pb2.FeedMessage()
     feed_message.ParseFromString(feed_bytes)
     
     # Extract feed timestamp
     feed_ts = from_epoch_seconds(feed_message.header.timestamp if feed_message.header.HasField("timestamp") else None)
     
-    entities = []
+    entity_ids = []
+    payloads = []
+    line_ids = []
+    stop_ids = []
+    trip_ids = []
+    entity_types = []
     
     for entity in feed_message.entity:
-        entity_id = entity.id
-        entity_type = None
+        # One ListFields call yields both the payload and which sub-message is set
+        fields = entity.ListFields()
         
         # Convert entity to dict for JSONB storage
-        payload = MessageToDict(entity, preserving_proto_field_name=True)
-        
-        # Extract line_id, stop_id, trip_id based on entity type
-        line_id = None
-        stop_id = None
-        trip_id = None
+        payload = _fields_to_dict(fields)
         
-        # Service alerts
-        if entity.HasField("alert"):
-            entity_type = "service_alerts"
-            alert = entity.alert
-            if alert.informed_entity:
-                for informed_entity in alert.informed_entity:
-                    if line_id is None and informed_entity.HasField("route_id"):
-                        line_id = informed_entity.route_id
-                    if stop_id is None and informed_entity.HasField("stop_id"):
-                        stop_id = informed_entity.stop_id
+        # Extract line_id, stop_id, trip_id based on entity type; FeedEntity
+        # has no oneof, so when several are set the highest-precedence one wins
+        chosen = None
+        for field, value in fields:
+            entry = _ENTITY_HANDLERS.get(field)
+            if entry is not None and (chosen is None or entry[0] < chosen[0]):
+                chosen = (entry[0], entry[1], value)
+        if chosen is None:
+            continue
+        entity_type, line_id, stop_id, trip_id = chosen[1](chosen[2])
         
-        # Trip updates
-        elif entity.HasField("trip_update"):
-            entity_type = "trip_updates"
-            trip_update = entity.trip_update
-            if trip_update.trip.HasField("route_id"):
-                line_id = trip_update.trip.route_id
-            if trip_update.trip.HasField("trip_id"):
-                trip_id = trip_update.trip.trip_id
-            if trip_update.stop_time_update:
-                for stop_time_update in trip_update.stop_time_update:
-                    if stop_time_update.HasField("stop_id"):
-                        stop_id = stop_time_update.stop_id
-                        break
-        
-        # Vehicle positions
-        elif entity.HasField("vehicle"):
-            entity_type = "vehicle_positions"
-            vehicle = entity.vehicle
-            if vehicle.trip.HasField("route_id"):
-                line_id = vehicle.trip.route_id
-            if vehicle.trip.HasField("trip_id"):
-                trip_id = vehicle.trip.trip_id
-            if vehicle.HasField("stop_id"):
-                stop_id = vehicle.stop_id
-        
-        if entity_type:
-            entities.append({
-                "entity_id": entity_id,
-                "payload": payload,
-                "line_id": line_id if line_id else None,
-                "stop_id": stop_id if stop_id else None,
-                "trip_id": trip_id if trip_id else None,
-                "entity_type": entity_type,
-            })
+        entity_ids.append(entity.id)
+        payloads.append(payload)
+        line_ids.append(line_id if line_id else None)
+        stop_ids.append(stop_id if stop_id else None)
+        trip_ids.append(trip_id if trip_id else None)
+        entity_types.append(entity_type)
     
+    entities = EntityColumns(
+        tuple(entity_ids), tuple(payloads), tuple(line_ids),
+        tuple(stop_ids), tuple(trip_ids), tuple(entity_types)
+    )
     return feed_ts, entities
 
+
+def get_parse_executor(max_workers: int) -> ProcessPoolExecutor:
+    """Return the shared parse process pool, (re)creating it for max_workers."""
+    global _parse_executor, _parse_executor_workers
+    with _parse_executor_lock:
+        if _parse_executor is not None and _parse_executor_workers != max_workers:
+            _parse_executor.shutdown(wait=True)
+            _parse_executor = None
+        if _parse_executor is None:
+            start_method = "forkserver" if "forkserver" in multiprocessing.get_all_start_methods() else "spawn"
+            _parse_executor = ProcessPoolExecutor(
+                max_workers=max_workers,
+                mp_context=multiprocessing.get_context(start_method)
+            )
+            _parse_executor_workers = max_workers
+        return _parse_executor
+
+
+def close_parse_executor() -> None:
+    """Shut down the shared parse process pool, if one was started."""
+    global _parse_executor, _parse_executor_workers
+    with _parse_executor_lock:
+        if _parse_executor is not None:
+            _parse_executor.shutdown(wait=True)
+            _parse_executor = None
+            _parse_executor_workers = 0
+
+
+def parse_feeds(feed_bytes_list: list, max_workers: int = 1) -> list:
+    """Parse several GTFS-RT feeds, optionally across worker processes.
+    
+    Parsing is pure-Python CPU work, so with max_workers > 1 each feed is
+    parsed in its own process; feeds are independent, so each one is a
+    natural unit of work and no entity re-serialization is needed. The
+    process pool is kept for later calls; close_parse_executor() stops it.
+    
+    Results share the parse cache and its read-only payloads, as with parse_feed.
+    
+    Returns:
+        list: (feed_ts, entities) per feed, in input order
+    """
+    if max_workers <= 1 or len(feed_bytes_list) <= 1:
+        return [parse_feed(feed_bytes) for feed_bytes in feed_bytes_list]
+    
+    # Only feeds missing from this process's cache are sent to workers
+    use_cache = PARSE_CACHE_SIZE > 0
+    if use_cache:
+        digests = [_feed_digest(feed_bytes) for feed_bytes in feed_bytes_list]
+        parsed_feeds = [_get_cached_feed(digest) for digest in digests]
+    else:
+        parsed_feeds = [None] * len(feed_bytes_list)
+    misses = [i for i, parsed in enumerate(parsed_feeds) if parsed is None]
+    
+    if len(misses) > 1:
+        executor = get_parse_executor(max_workers)
+        parsed_misses = list(executor.map(_parse_feed, [feed_bytes_list[i] for i in misses]))
+    else:
+        parsed_misses = [_parse_feed(feed_bytes_list[i]) for i in misses]
+    
+    for i, parsed in zip(misses, parsed_misses):
+        parsed_feeds[i] = parsed
+        if use_cache:
+            _cache_feed(digests[i], parsed)
+    
+    return parsed_feeds
+
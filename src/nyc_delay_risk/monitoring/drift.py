@@ -1,71 +1,190 @@
 import numpy as np
-import pandas as pd
-from datetime import datetime, timedelta
+from typing import NamedTuple
 from ..db import get_conn
 
+# Added to bin percentages to avoid divide by zero and log(0)
+PSI_EPSILON = 1e-6
 
-def compute_psi(actual_values, expected_values, bins=10):
-    """Compute Population Stability Index (PSI) between actual and expected distributions.
-    
-    PSI = sum((actual_pct - expected_pct) * ln(actual_pct / expected_pct))
-    
-    Args:
-        actual_values: Array of actual feature values
-        expected_values: Array of expected/baseline feature values
-        bins: Number of bins for discretization (default 10)
+# Features whose bin percentages all differ by less than this report a PSI of
+# 0 without evaluating the log terms (their PSI would be far below any alert threshold)
+PSI_NO_DRIFT_DIFF = 1e-4
+
+
+class ReferenceHistogram(NamedTuple):
+    """Binned baseline distributions for F features, reusable across PSI calls."""
+    min_val: np.ndarray
+    max_val: np.ndarray
+    scale: np.ndarray
+    edges: np.ndarray
+    constant: np.ndarray
+    expected_pct: np.ndarray
+    expected_log_pct: np.ndarray
+    expected_total: np.ndarray
+
+
+def _stack_rows(arrays):
+    """Stack 1-D arrays of possibly different lengths into a NaN-padded (F, N) array.
     
     Returns:
-        float: PSI value
+        tuple: (stacked array, lengths array)
     """
-    epsilon = 1e-6
+    lengths = np.array([len(values) for values in arrays], dtype=np.int64)
+    stacked = np.full((len(arrays), max(int(lengths.max(initial=0)), 1)), np.nan)
+    for row, values in enumerate(arrays):
+        stacked[row, :lengths[row]] = values
+    return stacked, lengths
+
+
+def _bin_counts(values, min_val, max_val, scale, edges):
+    """Equal-width histogram of each row of a (F, N) array, matching np.histogram.
     
-    # Determine bin edges from baseline (expected) distribution
-    # Use equal-width bins based on min/max of expected values only
-    if len(expected_values) == 0 or len(actual_values) == 0:
-        return float('nan')
+    Values outside [min, max] (and NaN padding) are not counted. Bins are
+    [edges[i], edges[i + 1]) with the last bin closed, as np.histogram
+    defines them for explicit edges: the index from the scaled offset can
+    be one off for values that land exactly on an edge (common for integer
+    counts), so it is corrected against the edges themselves.
     
-    # Convert to numpy arrays
-    expected_array = np.array(expected_values, dtype=float)
-    actual_array = np.array(actual_values, dtype=float)
+    Returns:
+        (F, bins) int64 array of counts
+    """
+    n_rows, n_edges = edges.shape
+    bins = n_edges - 1
+    
+    in_range = values >= min_val[:, None]
+    in_range &= values <= max_val[:, None]
+    rows = np.nonzero(in_range)[0]
+    in_range_values = values[in_range]
+    
+    # Values are >= min, so truncation is floor
+    bin_idx = ((in_range_values - min_val[rows]) * scale[rows]).astype(np.int64)
+    np.minimum(bin_idx, bins - 1, out=bin_idx)
+    
+    # Shift by one where rounding put a value on the wrong side of an edge
+    flat_edges = edges.ravel()
+    edge_base = rows * n_edges
+    bin_idx -= in_range_values < flat_edges[edge_base + bin_idx]
+    bin_idx += (in_range_values >= flat_edges[edge_base + bin_idx + 1]) & (bin_idx < bins - 1)
+    
+    # Offset each row into its own block of bins so one bincount covers all rows
+    return np.bincount(rows * bins + bin_idx, minlength=n_rows * bins).reshape(n_rows, bins)
+
+
+def build_reference_histogram(expected_values_list, bins=10):
+    """Bin the expected/baseline values of several features once.
     
-    min_val = expected_array.min()
-    max_val = expected_array.max()
+    Bins are equal-width over the min/max of each feature's expected values.
     
-    if min_val == max_val:
-        return 0.0
+    Args:
+        expected_values_list: Sequence of F arrays of expected/baseline feature values
+        bins: Number of bins for discretization (default 10)
     
-    bin_edges = np.linspace(min_val, max_val, bins + 1)
+    Returns:
+        ReferenceHistogram for use with compute_psi_reference
+    """
+    expected_array, expected_total = _stack_rows(expected_values_list)
+    
+    # Bin edges from baseline (expected) distribution only. fmin/fmax skip the
+    # NaN padding as they reduce, so min and max each take a single pass with
+    # no masked copies; empty rows come out NaN and are treated as constant
+    min_val = np.fmin.reduce(expected_array, axis=1)
+    max_val = np.fmax.reduce(expected_array, axis=1)
+    value_range = max_val - min_val
+    constant = ~(value_range > 0)
+    scale = bins / np.where(constant, 1.0, value_range)
+    edges = np.linspace(min_val, max_val, bins + 1, axis=1)
+    
+    expected_hist = _bin_counts(expected_array, min_val, max_val, scale, edges)
+    
+    # Convert to percentages, add epsilon and normalize again
+    with np.errstate(invalid='ignore', divide='ignore'):
+        expected_pct = expected_hist / expected_total[:, None]
+    expected_pct = expected_pct + PSI_EPSILON
+    expected_pct = expected_pct / expected_pct.sum(axis=1, keepdims=True)
+    
+    return ReferenceHistogram(
+        min_val, max_val, scale, edges, constant, expected_pct, np.log(expected_pct), expected_total
+    )
+
+
+def compute_psi_reference(actual_values_list, reference):
+    """Compute PSI for several features against a precomputed reference histogram.
     
-    # Compute histograms
-    expected_hist, _ = np.histogram(expected_array, bins=bin_edges)
-    actual_hist, _ = np.histogram(actual_array, bins=bin_edges)
+    Each feature's values become one row of a NaN-padded (F, N) array, so the
+    binning, histograms and PSI for all features run as single NumPy calls.
     
-    # Convert to percentages
-    expected_total = len(expected_array)
-    actual_total = len(actual_array)
+    Args:
+        actual_values_list: Sequence of F arrays of actual feature values
+        reference: ReferenceHistogram built from the expected values
     
-    if expected_total == 0 or actual_total == 0:
-        return float('nan')
+    Returns:
+        numpy array of F PSI values (NaN where either distribution is empty)
+    """
+    actual_array, actual_total = _stack_rows(actual_values_list)
+    actual_hist = _bin_counts(
+        actual_array, reference.min_val, reference.max_val, reference.scale, reference.edges
+    )
+    
+    # Convert to percentages, add epsilon and normalize again
+    with np.errstate(invalid='ignore', divide='ignore'):
+        actual_pct = actual_hist / actual_total[:, None]
+    actual_pct = actual_pct + PSI_EPSILON
+    actual_pct = actual_pct / actual_pct.sum(axis=1, keepdims=True)
+    
+    # Compute PSI per bin and sum per feature; the log terms are only
+    # evaluated for features whose distribution actually moved
+    diff = actual_pct - reference.expected_pct
+    drifted = np.abs(diff).max(axis=1) >= PSI_NO_DRIFT_DIFF
+    psi = np.zeros(len(actual_pct))
+    psi[drifted] = (
+        diff[drifted] * (np.log(actual_pct[drifted]) - reference.expected_log_pct[drifted])
+    ).sum(axis=1)
+    
+    psi[reference.constant] = 0.0
+    psi[(reference.expected_total == 0) | (actual_total == 0)] = np.nan
+    
+    return psi
+
+
+def compute_psi_many(actual_values_list, expected_values_list, bins=10):
+    """Compute PSI for several features at once.
     
-    expected_pct = expected_hist / expected_total
-    actual_pct = actual_hist / actual_total
+    Args:
+        actual_values_list: Sequence of F arrays of actual feature values
+        expected_values_list: Sequence of F arrays of expected/baseline feature values
+        bins: Number of bins for discretization (default 10)
     
-    # Add epsilon to avoid divide by zero and log(0)
-    expected_pct = expected_pct + epsilon
-    actual_pct = actual_pct + epsilon
+    Returns:
+        numpy array of F PSI values (NaN where either distribution is empty)
+    """
+    reference = build_reference_histogram(expected_values_list, bins=bins)
+    return compute_psi_reference(actual_values_list, reference)
+
+
+def compute_psi(actual_values, expected_values, bins=10):
+    """Compute Population Stability Index (PSI) between actual and expected distributions.
     
-    # Normalize again after adding epsilon
-    expected_pct = expected_pct / expected_pct.sum()
-    actual_pct = actual_pct / actual_pct.sum()
+    PSI = sum((actual_pct - expected_pct) * ln(actual_pct / expected_pct))
     
-    # Compute PSI per bin
-    psi_per_bin = (actual_pct - expected_pct) * np.log(actual_pct / expected_pct)
-    psi = psi_per_bin.sum()
+    Args:
+        actual_values: Array of actual feature values
+        expected_values: Array of expected/baseline feature values
+        bins: Number of bins for discretization (default 10)
     
-    return float(psi)
+    Returns:
+        float: PSI value
+    """
+    return float(compute_psi_many([actual_values], [expected_values], bins=bins)[0])
+
+
+# Rolling-sum features and the fact columns they are computed from
+FEATURE_SOURCE_COLUMNS = {
+    'alerts_sum_15m': 'alerts_count',
+    'trip_updates_sum_15m': 'trip_updates_count',
+    'vehicle_positions_sum_15m': 'vehicle_positions_count',
+}
 
 
-def get_feature_values(feature_name, time_window_start, time_window_end):
+def get_feature_values(feature_name, time_window_start, time_window_end, dtype=np.float64):
     """Get feature values from database for a given time window.
     
     Computes rolling sums similar to dataset builder for features:
@@ -73,55 +192,45 @@ def get_feature_values(feature_name, time_window_start, time_window_end):
     - trip_updates_sum_15m
     - vehicle_positions_sum_15m
     
+    The rolling sum runs server-side as a window function, so only the final
+    feature column is sent back.
+    
     Args:
         feature_name: Name of the feature (e.g., 'alerts_sum_15m')
         time_window_start: Start timestamp (inclusive)
         time_window_end: End timestamp (exclusive)
+        dtype: dtype of the returned array
     
     Returns:
         numpy array of feature values
     """
-    sql = """
-        SELECT bucket_start, line_id, stop_id, alerts_count, 
-               trip_updates_count, vehicle_positions_count
-        FROM mta.station_minute_facts
-        WHERE bucket_size_seconds = 60
-          AND bucket_start >= %s
-          AND bucket_start < %s
-        ORDER BY bucket_start, line_id, stop_id
+    if feature_name not in FEATURE_SOURCE_COLUMNS:
+        raise ValueError(f"Unsupported drift feature: {feature_name}")
+    source_column = FEATURE_SOURCE_COLUMNS[feature_name]
+    
+    # Same window as the dataset builder's rolling('15min', closed='left'):
+    # [t - 15min, t) per station. EXCLUDE GROUP drops the current bucket, and
+    # empty windows sum to NULL, matching the NaN rows dropped before.
+    sql = f"""
+        SELECT feature_value
+        FROM (
+            SELECT SUM({source_column}) OVER (
+                PARTITION BY line_id, stop_id
+                ORDER BY bucket_start
+                RANGE BETWEEN INTERVAL '15 minutes' PRECEDING AND CURRENT ROW
+                EXCLUDE GROUP
+            )::float8 AS feature_value
+            FROM mta.station_minute_facts
+            WHERE bucket_size_seconds = 60
+              AND bucket_start >= %s
+              AND bucket_start < %s
+              AND NOT (line_id IS NULL AND stop_id IS NULL)
+        ) AS rolling
+        WHERE feature_value IS NOT NULL
     """
     
     with get_conn() as conn:
-        df = pd.read_sql(sql, conn, params=(time_window_start, time_window_end))
-    
-    if len(df) == 0:
-        return np.array([])
-    
-    df['bucket_start'] = pd.to_datetime(df['bucket_start'])
-    df = df[~(df['line_id'].isna() & df['stop_id'].isna())]
-    
-    if len(df) == 0:
-        return np.array([])
-    
-    # Set index to bucket_start for time-based rolling
-    df = df.set_index('bucket_start')
-    
-    # Group by station identifiers
-    grouped = df.groupby(['line_id', 'stop_id'], dropna=False)
-    
-    # Compute 15-minute rolling sums
-    alerts_sum_15m = grouped['alerts_count'].rolling('15min', closed='left').sum()
-    trip_updates_sum_15m = grouped['trip_updates_count'].rolling('15min', closed='left').sum()
-    vehicle_positions_sum_15m = grouped['vehicle_positions_count'].rolling('15min', closed='left').sum()
-    
-    # Reset index and add rolling features
-    df = df.reset_index()
-    df['alerts_sum_15m'] = alerts_sum_15m.reset_index(level=[0, 1], drop=True).reindex(df.index)
-    df['trip_updates_sum_15m'] = trip_updates_sum_15m.reset_index(level=[0, 1], drop=True).reindex(df.index)
-    df['vehicle_positions_sum_15m'] = vehicle_positions_sum_15m.reset_index(level=[0, 1], drop=True).reindex(df.index)
-    
-    # Extract feature values (remove NaN from rolling window start)
-    feature_values = df[feature_name].dropna().values
-    
-    return feature_values.astype(float)
+        with conn.cursor() as cur:
+            cur.execute(sql, (time_window_start, time_window_end))
+            return np.fromiter((row[0] for row in cur), dtype=dtype, count=cur.rowcount)
 
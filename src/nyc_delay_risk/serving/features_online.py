@@ -1,103 +1,129 @@
-from datetime import datetime, timedelta
+import numpy as np
 from ..db import get_conn
 import logging
 
 logger = logging.getLogger(__name__)
 
 
+# Model feature order (alphabetical, as in training's get_feature_columns);
+# FEATURES_SQL returns the features in exactly this order
+FEATURE_NAMES = (
+    'alerts_count',
+    'alerts_sum_15m',
+    'alerts_sum_60m',
+    'day_of_week',
+    'hour_of_day',
+    'major_alerts_count',
+    'trip_updates_count',
+    'trip_updates_sum_15m',
+    'trip_updates_sum_60m',
+    'vehicle_positions_count',
+    'vehicle_positions_sum_15m',
+    'vehicle_positions_sum_60m',
+)
+
+# Latest bucket per station plus its rolling sums, in one round trip for any
+# number of stations. Windows are (latest - window_size, latest] (closed
+# interval on right); stations without data return no row. Each row is
+# (line_id, stop_id, latest bucket_start, *features in FEATURE_NAMES order).
+# Time features are taken in UTC, matching the dataset builder (Monday=0).
+FEATURES_SQL = """
+    WITH stations AS (
+        SELECT DISTINCT line_id, stop_id
+        FROM unnest(%s::text[], %s::text[]) AS s(line_id, stop_id)
+    ),
+    latest AS (
+        SELECT stations.line_id, stations.stop_id, l.bucket_start, l.alerts_count,
+               l.major_alerts_count, l.trip_updates_count, l.vehicle_positions_count,
+               EXTRACT(hour FROM l.bucket_start AT TIME ZONE 'UTC')::smallint AS hour_of_day,
+               (EXTRACT(isodow FROM l.bucket_start AT TIME ZONE 'UTC') - 1)::smallint AS day_of_week
+        FROM stations
+        CROSS JOIN LATERAL (
+            SELECT bucket_start, alerts_count, major_alerts_count,
+                   trip_updates_count, vehicle_positions_count
+            FROM mta.station_minute_facts
+            WHERE line_id = stations.line_id AND stop_id = stations.stop_id
+              AND bucket_size_seconds = 60
+            ORDER BY bucket_start DESC
+            LIMIT 1
+        ) AS l
+    )
+    SELECT
+        latest.line_id, latest.stop_id, latest.bucket_start,
+        COALESCE(latest.alerts_count, 0),
+        COALESCE(SUM(f.alerts_count) FILTER (WHERE f.bucket_start > latest.bucket_start - INTERVAL '15 minutes'), 0),
+        COALESCE(SUM(f.alerts_count), 0),
+        latest.day_of_week,
+        latest.hour_of_day,
+        COALESCE(latest.major_alerts_count, 0),
+        COALESCE(latest.trip_updates_count, 0),
+        COALESCE(SUM(f.trip_updates_count) FILTER (WHERE f.bucket_start > latest.bucket_start - INTERVAL '15 minutes'), 0),
+        COALESCE(SUM(f.trip_updates_count), 0),
+        COALESCE(latest.vehicle_positions_count, 0),
+        COALESCE(SUM(f.vehicle_positions_count) FILTER (WHERE f.bucket_start > latest.bucket_start - INTERVAL '15 minutes'), 0),
+        COALESCE(SUM(f.vehicle_positions_count), 0)
+    FROM latest
+    LEFT JOIN mta.station_minute_facts f
+      ON f.line_id = latest.line_id
+     AND f.stop_id = latest.stop_id
+     AND f.bucket_size_seconds = 60
+     AND f.bucket_start > latest.bucket_start - INTERVAL '60 minutes'
+     AND f.bucket_start <= latest.bucket_start
+    GROUP BY
+        latest.line_id, latest.stop_id, latest.bucket_start, latest.alerts_count,
+        latest.major_alerts_count, latest.trip_updates_count, latest.vehicle_positions_count,
+        latest.hour_of_day, latest.day_of_week
+"""
+
+
+def _row_to_features(row):
+    """Build the (features_array, latest_bucket_start) pair from a features query row.
+    
+    The features are written straight into a float32 array in FEATURE_NAMES
+    order, the layout and dtype the model consumes.
+    """
+    return np.array(row[3:], dtype=np.float32), row[2]
+
+
 def compute_features_online(line_id: str, stop_id: str):
     """Compute features for a station matching the training pipeline.
     
     Returns:
-        tuple: (features_dict, latest_bucket_start)
+        tuple: (features_array, latest_bucket_start), with the float32
+        features in FEATURE_NAMES order
     
     Raises:
         ValueError: If no data found for the station
     """
+    station_features = compute_features_online_batch([(line_id, stop_id)])
+    if not station_features:
+        raise ValueError(f"No data found for line_id={line_id}, stop_id={stop_id}")
+    
+    return station_features[(line_id, stop_id)]
+
+
+def compute_features_online_batch(stations):
+    """Compute features for several stations in a single query.
+    
+    Args:
+        stations: Sequence of (line_id, stop_id) pairs
+    
+    Returns:
+        dict: (line_id, stop_id) -> (features_array, latest_bucket_start);
+        stations without data are omitted
+    """
+    if not stations:
+        return {}
+    
+    line_ids = [line_id for line_id, _ in stations]
+    stop_ids = [stop_id for _, stop_id in stations]
+    
+    # Prepared on first use on each pooled connection, so steady-state
+    # requests skip parse/plan on the server
     with get_conn() as conn:
         with conn.cursor() as cur:
-            # Get latest bucket_start for this station
-            cur.execute("""
-                SELECT bucket_start, alerts_count, major_alerts_count,
-                       trip_updates_count, vehicle_positions_count
-                FROM mta.station_minute_facts
-                WHERE line_id = %s AND stop_id = %s AND bucket_size_seconds = 60
-                ORDER BY bucket_start DESC
-                LIMIT 1
-            """, (line_id, stop_id))
-            
-            row = cur.fetchone()
-            if row is None:
-                raise ValueError(f"No data found for line_id={line_id}, stop_id={stop_id}")
-            
-            latest_bucket_start = row[0]
-            alerts_count = row[1] or 0
-            major_alerts_count = row[2] or 0
-            trip_updates_count = row[3] or 0
-            vehicle_positions_count = row[4] or 0
-            
-            # Compute rolling sums for 15min and 60min windows
-            # Window is (latest - window_size, latest] (closed interval on right)
-            window_15min_start = latest_bucket_start - timedelta(minutes=15)
-            window_60min_start = latest_bucket_start - timedelta(minutes=60)
-            
-            # 15-minute rolling sums
-            cur.execute("""
-                SELECT 
-                    COALESCE(SUM(alerts_count), 0) as alerts_sum,
-                    COALESCE(SUM(trip_updates_count), 0) as trip_updates_sum,
-                    COALESCE(SUM(vehicle_positions_count), 0) as vehicle_positions_sum
-                FROM mta.station_minute_facts
-                WHERE line_id = %s 
-                  AND stop_id = %s 
-                  AND bucket_size_seconds = 60
-                  AND bucket_start > %s
-                  AND bucket_start <= %s
-            """, (line_id, stop_id, window_15min_start, latest_bucket_start))
-            
-            row_15m = cur.fetchone()
-            alerts_sum_15m = row_15m[0] or 0
-            trip_updates_sum_15m = row_15m[1] or 0
-            vehicle_positions_sum_15m = row_15m[2] or 0
-            
-            # 60-minute rolling sums
-            cur.execute("""
-                SELECT 
-                    COALESCE(SUM(alerts_count), 0) as alerts_sum,
-                    COALESCE(SUM(trip_updates_count), 0) as trip_updates_sum,
-                    COALESCE(SUM(vehicle_positions_count), 0) as vehicle_positions_sum
-                FROM mta.station_minute_facts
-                WHERE line_id = %s 
-                  AND stop_id = %s 
-                  AND bucket_size_seconds = 60
-                  AND bucket_start > %s
-                  AND bucket_start <= %s
-            """, (line_id, stop_id, window_60min_start, latest_bucket_start))
-            
-            row_60m = cur.fetchone()
-            alerts_sum_60m = row_60m[0] or 0
-            trip_updates_sum_60m = row_60m[1] or 0
-            vehicle_positions_sum_60m = row_60m[2] or 0
-            
-            # Time features from latest bucket_start
-            hour_of_day = latest_bucket_start.hour
-            day_of_week = latest_bucket_start.weekday()  # Monday=0
-            
-            # Build features dict matching training feature order
-            features = {
-                'alerts_count': int(alerts_count),
-                'major_alerts_count': int(major_alerts_count),
-                'trip_updates_count': int(trip_updates_count),
-                'vehicle_positions_count': int(vehicle_positions_count),
-                'hour_of_day': int(hour_of_day),
-                'day_of_week': int(day_of_week),
-                'alerts_sum_15m': int(alerts_sum_15m),
-                'alerts_sum_60m': int(alerts_sum_60m),
-                'trip_updates_sum_15m': int(trip_updates_sum_15m),
-                'trip_updates_sum_60m': int(trip_updates_sum_60m),
-                'vehicle_positions_sum_15m': int(vehicle_positions_sum_15m),
-                'vehicle_positions_sum_60m': int(vehicle_positions_sum_60m),
-            }
-            
-            return features, latest_bucket_start
+            cur.execute(FEATURES_SQL, (line_ids, stop_ids), prepare=True)
+            rows = cur.fetchall()
+    
+    return {(row[0], row[1]): _row_to_features(row) for row in rows}
 
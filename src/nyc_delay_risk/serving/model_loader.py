@@ -1,5 +1,7 @@
 import joblib
 import logging
+import numpy as np
+import lightgbm as lgb
 from pathlib import Path
 
 logger = logging.getLogger(__name__)
@@ -7,12 +9,101 @@ logger = logging.getLogger(__name__)
 # Module-level variable to store loaded model
 _model = None
 
+# Pickled models larger than this should be exported to a native format
+PICKLE_SIZE_WARNING_BYTES = 10 * 1024 * 1024
+
+# Native model formats: LightGBM text models and NumPy linear model weights
+LIGHTGBM_SUFFIXES = {'.txt', '.lgb'}
+LINEAR_SUFFIX = '.npz'
+
+
+class LinearModel:
+    """Binary logistic regression evaluated with NumPy from saved weights.
+    
+    Mirrors predict_proba/predict of a fitted sklearn LogisticRegression so
+    it can be served without unpickling sklearn objects.
+    """
+    
+    def __init__(self, coef, intercept, classes):
+        self.coef = np.asarray(coef, dtype=np.float64).ravel()
+        self.intercept = float(np.asarray(intercept).ravel()[0])
+        self.classes = np.asarray(classes)
+    
+    @classmethod
+    def from_sklearn(cls, model):
+        return cls(model.coef_, model.intercept_, model.classes_)
+    
+    @staticmethod
+    def is_supported(model):
+        """Whether model is a fitted binary linear classifier this class can mirror."""
+        return hasattr(model, 'coef_') and len(getattr(model, 'classes_', ())) == 2
+    
+    @classmethod
+    def load(cls, path):
+        with np.load(path) as weights:
+            return cls(weights['coef'], weights['intercept'], weights['classes'])
+    
+    def decision_function(self, X):
+        return X @ self.coef + self.intercept
+    
+    def predict_proba(self, X):
+        # Numerically stable sigmoid: 1 / (1 + exp(-z)) == exp(-log(1 + exp(-z)))
+        positive = np.exp(-np.logaddexp(0.0, -self.decision_function(X)))
+        return np.column_stack([1.0 - positive, positive])
+    
+    def predict(self, X):
+        return self.classes[(self.decision_function(X) > 0).astype(int)]
+    
+    def predict_with_labels(self, X):
+        """Positive-class probabilities and predicted labels from one decision pass."""
+        decision = self.decision_function(X)
+        return np.exp(-np.logaddexp(0.0, -decision)), self.classes[(decision > 0).astype(int)]
+
+
+def save_native_model(model, output_path):
+    """Save a trained model in a format that loads without pickle.
+    
+    LightGBM boosters are written as LightGBM text models; sklearn logistic
+    regression is written as an .npz of its weights.
+    
+    Returns:
+        Path: the file written (suffix chosen from the model type)
+    """
+    output_path = Path(output_path)
+    if isinstance(model, lgb.Booster):
+        output_path = output_path.with_suffix('.lgb')
+        model.save_model(str(output_path))
+    elif LinearModel.is_supported(model):
+        output_path = output_path.with_suffix(LINEAR_SUFFIX)
+        np.savez(output_path, coef=model.coef_, intercept=model.intercept_, classes=model.classes_)
+    else:
+        raise ValueError(f"No native format for model type {type(model).__name__}")
+    return output_path
+
 
 def load_model(model_path):
-    """Load model from pickle file and store in module-level variable."""
+    """Load model and store in module-level variable.
+    
+    LightGBM text models (.txt/.lgb) are parsed by LightGBM's C loader and
+    .npz files hold linear model weights; anything else is treated as a
+    joblib pickle.
+    """
     global _model
+    model_path = Path(model_path)
     logger.info(f"Loading model from {model_path}")
-    _model = joblib.load(model_path)
+    if model_path.suffix in LIGHTGBM_SUFFIXES:
+        _model = lgb.Booster(model_file=str(model_path))
+    elif model_path.suffix == LINEAR_SUFFIX:
+        _model = LinearModel.load(model_path)
+    else:
+        size = model_path.stat().st_size
+        if size > PICKLE_SIZE_WARNING_BYTES:
+            logger.warning(
+                f"Pickled model is {size / 1024 / 1024:.1f}MB; export it with "
+                f"scripts/export_model.py to load it natively"
+            )
+        # Memory-map any large numpy arrays instead of copying them into the heap
+        _model = joblib.load(model_path, mmap_mode='r')
     logger.info("Model loaded successfully")
     return _model
 
@@ -23,3 +114,30 @@ def get_model():
         raise RuntimeError("Model not loaded. Call load_model() first.")
     return _model
 
+
+def make_predict_fn(model):
+    """Build a predict function specialized to the model type.
+    
+    The model type is inspected once here instead of on every call. Binary
+    logistic regression is served by a NumPy kernel over its weights, which
+    skips sklearn's per-call input validation.
+    
+    Returns:
+        callable: maps a (N, n_features) array to (risk_probabilities, risk_labels)
+    """
+    if isinstance(model, LinearModel) or LinearModel.is_supported(model):
+        linear_model = model if isinstance(model, LinearModel) else LinearModel.from_sklearn(model)
+        predict_fn = linear_model.predict_with_labels
+    elif hasattr(model, 'predict_proba'):
+        # Sklearn model
+        def predict_fn(feature_array):
+            return model.predict_proba(feature_array)[:, 1], model.predict(feature_array)
+    else:
+        # LightGBM model
+        best_iteration = getattr(model, 'best_iteration', None)
+        
+        def predict_fn(feature_array):
+            risk_probabilities = model.predict(feature_array, num_iteration=best_iteration)
+            return risk_probabilities, (risk_probabilities > 0.5).astype(int)
+    
+    return predict_fn
@@ -1,25 +1,37 @@
-from sklearn.metrics import (
-    accuracy_score, precision_score, recall_score, f1_score, roc_auc_score
-)
-import matplotlib.pyplot as plt
+from sklearn.metrics import accuracy_score, precision_recall_fscore_support, roc_auc_score
 from sklearn.metrics import confusion_matrix
 import numpy as np
 
 
 def compute_metrics(y_true, y_pred, y_pred_proba):
     """Compute classification metrics."""
+    # Labels are 0/1, so int8 copies are validated once and scanned cheaply
+    y_true = np.asarray(y_true, dtype=np.int8)
+    y_pred = np.asarray(y_pred, dtype=np.int8)
+    
+    # Precision, recall and F1 from a single confusion count
+    precision, recall, f1, _ = precision_recall_fscore_support(
+        y_true, y_pred, average='binary', zero_division=0
+    )
+    has_both_classes = y_true.size > 0 and y_true.min() != y_true.max()
     metrics = {
         'accuracy': accuracy_score(y_true, y_pred),
-        'precision': precision_score(y_true, y_pred, zero_division=0),
-        'recall': recall_score(y_true, y_pred, zero_division=0),
-        'f1': f1_score(y_true, y_pred, zero_division=0),
-        'roc_auc': roc_auc_score(y_true, y_pred_proba) if len(np.unique(y_true)) > 1 else 0.0
+        'precision': precision,
+        'recall': recall,
+        'f1': f1,
+        'roc_auc': roc_auc_score(y_true, y_pred_proba) if has_both_classes else 0.0
     }
     return metrics
 
 
 def plot_confusion_matrix(y_true, y_pred, model_name, save_path):
     """Create and save confusion matrix plot."""
+    # Imported lazily with the non-interactive Agg backend: only the plot
+    # needs matplotlib, and Agg skips probing for GUI toolkits
+    import matplotlib
+    matplotlib.use('Agg')
+    import matplotlib.pyplot as plt
+    
     cm = confusion_matrix(y_true, y_pred)
     
     fig, ax = plt.subplots(figsize=(8, 6))
@@ -35,13 +47,12 @@ def plot_confusion_matrix(y_true, y_pred, model_name, save_path):
            xlabel='Predicted Label')
     
     thresh = cm.max() / 2.0
-    for i in range(cm.shape[0]):
-        for j in range(cm.shape[1]):
-            ax.text(j, i, format(cm[i, j], 'd'),
-                   ha="center", va="center",
-                   color="white" if cm[i, j] > thresh else "black")
+    for (i, j), count in np.ndenumerate(cm):
+        ax.annotate(format(count, 'd'), (j, i),
+                    ha="center", va="center",
+                    color="white" if count > thresh else "black")
     
-    plt.tight_layout()
-    plt.savefig(save_path)
-    plt.close()
+    fig.tight_layout()
+    fig.savefig(save_path)
+    plt.close(fig)
 
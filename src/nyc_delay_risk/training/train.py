@@ -3,10 +3,14 @@ import lightgbm as lgb
 
 
 def get_feature_columns(df):
-    """Extract feature column names, excluding identifiers and label."""
+    """Extract feature column names, excluding identifiers and label.
+    
+    Names are sorted, so the feature order does not depend on how the
+    dataset's columns were produced and matches FEATURE_NAMES in serving/features_online.py.
+    """
     exclude_cols = {'fact_id', 'bucket_start', 'bucket_size_seconds', 
                     'line_id', 'stop_id', 'created_at', 'label'}
-    feature_cols = [col for col in df.columns if col not in exclude_cols]
+    feature_cols = sorted(col for col in df.columns if col not in exclude_cols)
     return feature_cols
 
 
@@ -22,10 +26,18 @@ def train_logistic_regression(X_train, y_train):
     return model
 
 
-def train_lightgbm(X_train, y_train, X_val, y_val):
-    """Train LightGBM classifier with early stopping on validation set."""
-    train_data = lgb.Dataset(X_train, label=y_train)
-    val_data = lgb.Dataset(X_val, label=y_val, reference=train_data)
+def train_lightgbm(X_train, y_train, X_val, y_val, categorical_feature='auto', num_threads=0):
+    """Train LightGBM classifier with early stopping on validation set.
+    
+    categorical_feature: column indices to treat as categorical (e.g. hour of day)
+    num_threads: LightGBM worker threads (0 lets OpenMP decide)
+    """
+    train_data = lgb.Dataset(
+        X_train, label=y_train, categorical_feature=categorical_feature, free_raw_data=True
+    )
+    val_data = lgb.Dataset(
+        X_val, label=y_val, reference=train_data, categorical_feature=categorical_feature, free_raw_data=True
+    )
     
     params = {
         'objective': 'binary',
@@ -36,6 +48,8 @@ def train_lightgbm(X_train, y_train, X_val, y_val):
         'subsample': 0.8,
         'colsample_bytree': 0.8,
         'random_state': 42,
+        'num_threads': num_threads,
+        'force_col_wise': True,
         'verbosity': -1
     }
     
@@ -1,5 +1,9 @@
 from datetime import datetime, timezone
 
+# Bound once so conversions skip the attribute lookups
+_from_timestamp = datetime.fromtimestamp
+_UTC = timezone.utc
+
 
 def utc_now() -> datetime:
     """Return current UTC datetime with timezone awareness."""
@@ -10,5 +14,5 @@ def from_epoch_seconds(ts: int | None) -> datetime:
     """Convert epoch seconds to UTC datetime. If None, return current UTC time."""
     if ts is None:
         return utc_now()
-    return datetime.fromtimestamp(ts, tz=timezone.utc)
+    return _from_timestamp(ts, _UTC)
 
@@ -0,0 +1,55 @@
+import sys
+from datetime import datetime, timezone
+from pathlib import Path
+
+import numpy as np
+import pytest
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+import app.main as api
+from app.schemas import PredictRequest
+from nyc_delay_risk.serving.features_online import FEATURE_NAMES
+
+AS_OF = datetime(2024, 1, 1, 8, 0, tzinfo=timezone.utc)
+
+
+@pytest.fixture
+def stations(monkeypatch):
+    """Feature rows for stations 0..4 whose first feature is the station number."""
+    def compute_features_online_batch(keys):
+        rows = {}
+        for line_id, stop_id in keys:
+            if stop_id == "missing":
+                continue
+            features = np.zeros(len(FEATURE_NAMES), dtype=np.float32)
+            features[0] = float(stop_id)
+            rows[(line_id, stop_id)] = (features, AS_OF)
+        return rows
+    
+    def predict_fn(feature_array):
+        # Probability encodes the station, so misordered results are visible
+        risk_probabilities = feature_array[:, 0] / 10.0
+        return risk_probabilities, (risk_probabilities > 0.25).astype(int)
+    
+    monkeypatch.setattr(api, "compute_features_online_batch", compute_features_online_batch)
+    monkeypatch.setattr(api.app.state, "predict_fn", predict_fn, raising=False)
+    api.prediction_cache.clear()
+    yield
+    api.prediction_cache.clear()
+
+
+def test_predict_batch_keeps_request_order_with_cache_hits(stations):
+    # Warm the cache for stations 3 and 1 so hits and misses interleave
+    api._do_predict_batch([PredictRequest(line_id="A", stop_id=stop_id) for stop_id in ("3", "1")])
+    
+    batch = [
+        PredictRequest(line_id="A", stop_id=stop_id)
+        for stop_id in ("4", "3", "missing", "0", "1", "2")
+    ]
+    response = api._do_predict_batch(batch)
+    
+    assert [p.stop_id for p in response.predictions] == ["4", "3", "0", "1", "2"]
+    assert [p.risk_probability for p in response.predictions] == pytest.approx([0.4, 0.3, 0.0, 0.1, 0.2])
+    assert [p.risk_label for p in response.predictions] == [1, 1, 0, 0, 0]
+    assert [r.stop_id for r in response.not_found] == ["missing"]
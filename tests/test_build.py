@@ -0,0 +1,115 @@
+import sys
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
+
+from nyc_delay_risk.dataset.build import create_features, create_label
+
+
+def reference_label(df):
+    """Label each row by scanning every row of the same station (NULL keys match NULL)."""
+    horizon = pd.Timedelta(minutes=15)
+    labels = []
+    for row in df.itertuples():
+        same_station = (
+            ((df['line_id'] == row.line_id) | (df['line_id'].isna() & pd.isna(row.line_id)))
+            & ((df['stop_id'] == row.stop_id) | (df['stop_id'].isna() & pd.isna(row.stop_id)))
+        )
+        in_window = (df['bucket_start'] > row.bucket_start) & (df['bucket_start'] <= row.bucket_start + horizon)
+        labels.append(int(((df['alerts_count'] > 0) & same_station & in_window).any()))
+    return labels
+
+
+ROLLING_WINDOWS = {'15m': pd.Timedelta(minutes=15), '60m': pd.Timedelta(minutes=60)}
+COUNT_PREFIXES = ('alerts', 'trip_updates', 'vehicle_positions')
+
+
+def reference_rolling_sums(df):
+    """Sum each count over [t - window, t) for the row's station, NaN when the window is empty."""
+    sums = {f'{prefix}_sum_{suffix}': [] for suffix in ROLLING_WINDOWS for prefix in COUNT_PREFIXES}
+    for row in df.itertuples():
+        same_station = (
+            ((df['line_id'] == row.line_id) | (df['line_id'].isna() & pd.isna(row.line_id)))
+            & ((df['stop_id'] == row.stop_id) | (df['stop_id'].isna() & pd.isna(row.stop_id)))
+        )
+        for suffix, window in ROLLING_WINDOWS.items():
+            in_window = (df['bucket_start'] >= row.bucket_start - window) & (df['bucket_start'] < row.bucket_start)
+            for prefix in COUNT_PREFIXES:
+                sums[f'{prefix}_sum_{suffix}'].append(
+                    df.loc[same_station & in_window, f'{prefix}_count'].sum(min_count=1)
+                )
+    return pd.DataFrame(sums, index=df.index)
+
+
+def random_facts(rng, n_rows, unit):
+    """Facts on a whole-minute grid, so window boundaries are hit exactly."""
+    start = pd.Timestamp("2024-01-01", tz="UTC")
+    minutes = rng.integers(0, 240, n_rows)
+    return pd.DataFrame({
+        'bucket_start': (start + pd.to_timedelta(minutes, unit='min')).as_unit(unit),
+        'line_id': rng.choice(np.array(['A', 'C', None], dtype=object), n_rows),
+        'stop_id': rng.choice(np.array(['A27N', 'A28N', None], dtype=object), n_rows),
+        'alerts_count': rng.choice([0, 0, 0, 1, 2], n_rows),
+        'trip_updates_count': rng.integers(0, 5, n_rows),
+        'vehicle_positions_count': rng.integers(0, 5, n_rows),
+    }).drop_duplicates(['line_id', 'stop_id', 'bucket_start'])
+
+
+def test_create_features_rolling_sums_match_reference():
+    rng = np.random.default_rng(0)
+    for _ in range(30):
+        # Unsorted rows with (line, NULL), (NULL, stop) and (NULL, NULL) stations
+        df = random_facts(rng, int(rng.integers(1, 120)), 'ns')
+        
+        features = create_features(df)
+        
+        expected = reference_rolling_sums(features)
+        np.testing.assert_allclose(
+            features[expected.columns].to_numpy(dtype=float), expected.to_numpy(dtype=float)
+        )
+
+
+def test_create_label_matches_reference():
+    rng = np.random.default_rng(0)
+    for unit in ('ns', 'us'):
+        for _ in range(20):
+            df = random_facts(rng, int(rng.integers(1, 200)), unit)
+            
+            labeled = create_label(df)
+            
+            expected = reference_label(labeled)
+            np.testing.assert_array_equal(labeled['label'].to_numpy(), expected)
+
+
+def test_create_label_window_boundaries():
+    start = pd.Timestamp("2024-01-01 08:00", tz="UTC")
+    df = pd.DataFrame({
+        'bucket_start': [start, start + pd.Timedelta(minutes=15), start + pd.Timedelta(minutes=31)],
+        'line_id': ['A', 'A', 'A'],
+        'stop_id': ['A27N', 'A27N', 'A27N'],
+        'alerts_count': [1, 1, 0],
+    })
+    
+    labeled = create_label(df)
+    
+    # An alert exactly 15 minutes ahead counts; the row's own alert does not,
+    # and 16 minutes ahead is out of range
+    assert labeled['label'].tolist() == [1, 0, 0]
+
+
+def test_create_label_empty_frame():
+    df = pd.DataFrame({
+        'bucket_start': pd.Series([], dtype='datetime64[ns, UTC]'),
+        'line_id': pd.Series([], dtype=object),
+        'stop_id': pd.Series([], dtype=object),
+        'alerts_count': pd.Series([], dtype=np.int64),
+    })
+    
+    labeled = create_label(df)
+    
+    assert len(labeled) == 0
+    assert labeled['label'].dtype == np.int8
+
@@ -0,0 +1,33 @@
+import sys
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, str(Path(__file__).parent.parent / "scripts"))
+
+from build_dataset import compact_dtypes
+
+
+def test_compact_dtypes_narrows_only_64_bit_columns():
+    df = pd.DataFrame({
+        'line_id': ['A', 'C'],
+        'stop_id': ['A27N', None],
+        'alerts_count': np.array([1, 2], dtype=np.int64),
+        'alerts_sum_15m': np.array([0.0, 3.0], dtype=np.float64),
+        'hour_of_day': np.array([8, 23], dtype=np.int8),
+        'label': np.array([0, 1], dtype=np.int8),
+    })
+    
+    compact = compact_dtypes(df)
+    
+    assert compact['line_id'].dtype == 'category'
+    assert compact['stop_id'].dtype == 'category'
+    assert compact['alerts_count'].dtype == np.int32
+    assert compact['alerts_sum_15m'].dtype == np.float32
+    assert compact['hour_of_day'].dtype == np.int8
+    assert compact['label'].dtype == np.int8
+    assert compact['alerts_count'].tolist() == [1, 2]
+    assert compact['stop_id'].isna().tolist() == [False, True]
+    # The input frame is left untouched
+    assert df['alerts_count'].dtype == np.int64
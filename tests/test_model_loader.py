@@ -0,0 +1,46 @@
+import sys
+from pathlib import Path
+
+import numpy as np
+from sklearn.linear_model import LogisticRegression
+
+sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
+
+from nyc_delay_risk.serving.model_loader import (
+    LinearModel, load_model, make_predict_fn, save_native_model
+)
+
+
+def fit_logistic_regression(rng, classes=(0, 1)):
+    X = rng.normal(size=(400, 12)) * rng.uniform(0.5, 20.0, 12)
+    y = np.where(X[:, 0] + X[:, 3] * 0.1 + rng.normal(size=400) > 0, classes[1], classes[0])
+    return LogisticRegression(max_iter=1000).fit(X, y), X
+
+
+def test_linear_model_matches_logistic_regression():
+    rng = np.random.default_rng(0)
+    model, X = fit_logistic_regression(rng)
+    # Include rows far from the boundary, where a naive sigmoid overflows
+    X = np.vstack([X, X[:5] * 1e4]).astype(np.float32)
+    
+    linear_model = LinearModel.from_sklearn(model)
+    
+    np.testing.assert_allclose(linear_model.predict_proba(X), model.predict_proba(X), rtol=1e-10, atol=1e-12)
+    np.testing.assert_array_equal(linear_model.predict(X), model.predict(X))
+    
+    risk_probabilities, risk_labels = make_predict_fn(model)(X)
+    np.testing.assert_allclose(risk_probabilities, model.predict_proba(X)[:, 1], rtol=1e-10, atol=1e-12)
+    np.testing.assert_array_equal(risk_labels, model.predict(X))
+
+
+def test_native_export_round_trip(tmp_path):
+    rng = np.random.default_rng(1)
+    model, X = fit_logistic_regression(rng, classes=(3, 7))
+    
+    path = save_native_model(model, tmp_path / "best_model.pkl")
+    loaded = load_model(path)
+    
+    assert path.suffix == ".npz"
+    assert isinstance(loaded, LinearModel)
+    np.testing.assert_allclose(loaded.predict_proba(X), model.predict_proba(X), rtol=1e-10, atol=1e-12)
+    np.testing.assert_array_equal(loaded.predict(X), model.predict(X))
@@ -0,0 +1,78 @@
+import sys
+from pathlib import Path
+
+from google.protobuf.json_format import MessageToDict
+from google.transit import gtfs_realtime_pb2
+
+sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
+
+from nyc_delay_risk.ingestion.parser import parse_feed
+
+
+def build_feed() -> gtfs_realtime_pb2.FeedMessage:
+    """A feed with a trip update, a vehicle position and an alert."""
+    feed = gtfs_realtime_pb2.FeedMessage()
+    feed.header.gtfs_realtime_version = "2.0"
+    feed.header.incrementality = gtfs_realtime_pb2.FeedHeader.FULL_DATASET
+    feed.header.timestamp = 1700000000
+    
+    entity = feed.entity.add(id="trip-1")
+    trip_update = entity.trip_update
+    trip_update.trip.trip_id = "A20231114"
+    trip_update.trip.route_id = "A"
+    trip_update.trip.schedule_relationship = gtfs_realtime_pb2.TripDescriptor.ADDED
+    trip_update.timestamp = 1700000005
+    trip_update.delay = -30
+    for stop_id, arrival in (("A27N", 1700000100), ("A28N", 1700000200)):
+        stop_time_update = trip_update.stop_time_update.add(stop_id=stop_id)
+        stop_time_update.arrival.time = arrival
+        stop_time_update.arrival.delay = 45
+        stop_time_update.schedule_relationship = (
+            gtfs_realtime_pb2.TripUpdate.StopTimeUpdate.SKIPPED
+        )
+    
+    entity = feed.entity.add(id="vehicle-1")
+    vehicle = entity.vehicle
+    vehicle.trip.trip_id = "B20231114"
+    vehicle.trip.route_id = "B"
+    vehicle.stop_id = "D14S"
+    vehicle.current_status = gtfs_realtime_pb2.VehiclePosition.STOPPED_AT
+    vehicle.occupancy_status = gtfs_realtime_pb2.VehiclePosition.STANDING_ROOM_ONLY
+    vehicle.position.latitude = 40.7128
+    vehicle.position.longitude = -74.006
+    vehicle.position.bearing = 0.9
+    vehicle.position.speed = float("nan")
+    vehicle.position.odometer = 12345.678
+    vehicle.timestamp = 1700000010
+    
+    entity = feed.entity.add(id="alert-1")
+    alert = entity.alert
+    alert.cause = gtfs_realtime_pb2.Alert.CONSTRUCTION
+    alert.effect = gtfs_realtime_pb2.Alert.REDUCED_SERVICE
+    period = alert.active_period.add(start=1700000000)
+    period.end = 1700003600
+    alert.informed_entity.add(agency_id="MTASBWY")
+    alert.informed_entity.add(route_id="C", stop_id="A15")
+    alert.header_text.translation.add(text="Delays", language="en")
+    
+    return feed
+
+
+def test_payloads_match_message_to_dict():
+    feed = build_feed()
+    
+    feed_ts, entities = parse_feed(feed.SerializeToString())
+    
+    assert feed_ts.timestamp() == 1700000000
+    assert entities.entity_ids == ("trip-1", "vehicle-1", "alert-1")
+    for entity, payload in zip(feed.entity, entities.payloads):
+        assert payload == MessageToDict(entity, preserving_proto_field_name=True)
+
+
+def test_entity_keys_are_extracted_per_type():
+    _, entities = parse_feed(build_feed().SerializeToString())
+    
+    assert entities.entity_types == ("trip_updates", "vehicle_positions", "service_alerts")
+    assert entities.line_ids == ("A", "B", "C")
+    assert entities.stop_ids == ("A27N", "D14S", "A15")
+    assert entities.trip_ids == ("A20231114", "B20231114", None)